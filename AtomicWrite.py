@@ -0,0 +1,31 @@
+import os
+from contextlib import contextmanager
+
+"""
+Helper for replacing a file only once its new contents have been fully written. The contents are written to a temporary
+file next to the destination, which is then moved into place, so a file being read or watched is never seen half-written
+and an interrupted write never corrupts the previous version. Used for the spreadsheet cache, checkpoints, and exported
+schedules.
+
+Author: Ryan Johnson
+"""
+
+
+@contextmanager
+def atomic_write(path, mode="w", newline=None):
+    """
+    Opens a temporary file to write to, moving it to the given path once the block finishes without an error. The
+    directory holding the path is created if it doesn't exist.
+
+    :param path: file to be written
+    :param mode: mode to open the temporary file with, "w" for text or "wb" for binary
+    :param newline: newline argument passed to open() for text files
+    :return: the open temporary file
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temporary_path = path + ".tmp"
+    with open(temporary_path, mode, newline=newline) as file:
+        yield file
+    os.replace(temporary_path, path)
@@ -0,0 +1,206 @@
+import argparse
+import csv
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from Catalog import Catalog
+from DataLoader import DataLoader
+
+"""
+Runner for tuning the genetic algorithm by running many scenarios as a single parallel job. A scenario is a set of
+optimizer parameters run with a single seed, and the runner takes either a grid of values for each parameter, expanded
+to every combination, or an explicit list of parameter sets. Each parameter set is run once per seed.
+
+The spreadsheets and configuration file are loaded once, in the main process, and the resulting catalog is sent to each
+worker process when the process pool is started. The catalog is never changed by a run, so every scenario run by a
+worker shares the same copy of it. Each scenario runs the algorithm quietly until it converges (or until the time or
+generation limit), and the best fitness score, number of generations, and wall-clock time of every run are collected
+into a single results table.
+
+The following parameters can be varied: population_size, crossover_rate, mutation_rate, convergence_num, and
+warm_start, passed to the optimizer when it is created, along with elite_count, tie_break, remove_duplicates, and
+local_search_count, setting ELITE_COUNT, TIE_BREAK, REMOVE_DUPLICATES, and LOCAL_SEARCH_COUNT once it has been created.
+Any other parameter is rejected before a scenario runs. The runner can be used from the command line, e.g.
+`py BatchRunner.py --population-size 200 500 --mutation-rate 0.5 0.9 --seeds 0 1 2 --output results.csv`
+or from Python, e.g. `BatchRunner(BatchRunner.parameter_grid({"population_size": [200, 500]}), seeds=[0, 1]).run()`.
+
+Author: Ryan Johnson
+"""
+
+# Catalog used by a worker process to run scenarios, set up once when the worker is started
+_worker_catalog = None
+
+
+def _initialize_batch_worker(catalog):
+    """
+    Stores the catalog used by every scenario run within a worker process.
+
+    :param catalog: catalog shared by every scenario
+    """
+    global _worker_catalog
+    _worker_catalog = catalog
+
+
+def _run_scenario(parameters, seed, time_limit, max_generations):
+    """
+    Runs the genetic algorithm for a single scenario within a worker process.
+
+    :param parameters: dictionary of optimizer parameters
+    :param seed: seed for the random number generator
+    :param time_limit: number of seconds the run may take, or None for no limit
+    :param max_generations: largest number of generations to run, or None for no limit
+    :return: dictionary holding the scenario's parameters, seed, and results
+    """
+    from Optimizer import Optimizer
+
+    arguments = {key: value for key, value in parameters.items() if key in BatchRunner.OPTIMIZER_ARGUMENTS}
+    optimizer = Optimizer(catalog=_worker_catalog, seed=seed, **arguments)
+    for key, value in parameters.items():
+        if key in BatchRunner.OPTIMIZER_SETTINGS:
+            setattr(optimizer, key.upper(), value)
+    result = optimizer.solve(time_limit, max_generations)
+    return {**parameters, "seed": seed, "best_fitness": float(result.fitness), "generations": optimizer.generation_num,
+            "seconds": result.seconds, "stop_reason": result.status, "classrooms_used": result.num_classrooms_used()}
+
+
+class BatchRunner:
+    # Parameters passed to the optimizer when it is created
+    OPTIMIZER_ARGUMENTS = ("population_size", "crossover_rate", "mutation_rate", "convergence_num", "warm_start")
+    # Parameters setting the optimizer attribute of the same name in upper case once it has been created. Only settings
+    # read while the algorithm runs are allowed, since the population is formed when the optimizer is created.
+    OPTIMIZER_SETTINGS = ("elite_count", "tie_break", "remove_duplicates", "local_search_count")
+    RESULT_COLUMNS = ["seed", "best_fitness", "generations", "seconds", "stop_reason", "classrooms_used"]
+
+    def __init__(self, parameter_sets, seeds=(0,), workers=None, time_limit=None, max_generations=None, catalog=None):
+        self.parameter_sets = [dict(parameters) for parameters in parameter_sets]
+        self.seeds = list(seeds)
+        self.workers = workers if workers is not None else os.cpu_count()
+        self.time_limit = time_limit
+        self.max_generations = max_generations
+        self.catalog = catalog
+        self.check_parameters()
+        self.results = []
+        self.total_seconds = None
+
+    @staticmethod
+    def parameter_grid(grid):
+        """
+        Expands a grid of parameter values into every combination of them.
+
+        :param grid: dictionary mapping each parameter name to a list of its values
+        :return: list of parameter dictionaries, one for each combination of values
+        """
+        names = list(grid)
+        return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+    def check_parameters(self):
+        """
+        Makes sure every parameter is one the runner can vary, so mistakes are found before any scenario runs.
+        """
+        for parameters in self.parameter_sets:
+            for key in parameters:
+                if key not in self.OPTIMIZER_ARGUMENTS and key not in self.OPTIMIZER_SETTINGS:
+                    raise ValueError(f"Unknown optimizer parameter '{key}', expected one of "
+                                     f"{list(self.OPTIMIZER_ARGUMENTS + self.OPTIMIZER_SETTINGS)}")
+
+    def load_catalog(self):
+        """
+        Loads the catalog from the spreadsheets and configuration file, unless one was given to the runner.
+
+        :return: Catalog object shared by every scenario
+        """
+        if self.catalog is None:
+            loader = DataLoader()
+            classroom_list, course_list, instructor_list = loader.load()
+            self.catalog = Catalog(course_list, classroom_list, instructor_list, *loader.load_config())
+        return self.catalog
+
+    def run(self, progress=None):
+        """
+        Runs every parameter set with every seed across the process pool.
+
+        :param progress: function called with each row of the results table as its scenario finishes, or None
+        :return: list holding a row of the results table for each scenario, in the order of the parameter sets and seeds
+        """
+        catalog = self.load_catalog()
+        scenarios = [(parameters, seed) for parameters in self.parameter_sets for seed in self.seeds]
+        rows = [None] * len(scenarios)
+        start = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_initialize_batch_worker,
+                                 initargs=(catalog,)) as executor:
+            futures = {executor.submit(_run_scenario, parameters, seed, self.time_limit, self.max_generations): index
+                       for index, (parameters, seed) in enumerate(scenarios)}
+            for future in as_completed(futures):
+                rows[futures[future]] = future.result()
+                if progress is not None:
+                    progress(rows[futures[future]])
+        self.total_seconds = time.perf_counter() - start
+        self.results = rows
+        return rows
+
+    def columns(self):
+        """
+        Lists the columns of the results table: every parameter that was varied, followed by the results of each run.
+
+        :return: list of column names
+        """
+        parameter_names = list(dict.fromkeys(key for parameters in self.parameter_sets for key in parameters))
+        return parameter_names + self.RESULT_COLUMNS
+
+    def write_csv(self, path):
+        """
+        Writes the results table to a CSV file.
+
+        :param path: file to write the results to
+        """
+        with open(path, "w", newline="") as file:
+            writer = csv.DictWriter(file, fieldnames=self.columns())
+            writer.writeheader()
+            writer.writerows(self.results)
+
+    def format_table(self):
+        """
+        Formats the results table as aligned text.
+
+        :return: string holding a header line and a line for each scenario
+        """
+        columns = self.columns()
+        cells = [columns] + [["" if row.get(column) is None else str(row.get(column)) for column in columns]
+                             for row in self.results]
+        widths = [max(len(line[index]) for line in cells) for index in range(len(columns))]
+        return "\n".join("  ".join(cell.ljust(width) for cell, width in zip(line, widths)) for line in cells)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the genetic algorithm for a grid of parameters and seeds.")
+    parser.add_argument("--population-size", type=int, nargs="+", help="population sizes to try")
+    parser.add_argument("--crossover-rate", type=float, nargs="+", help="crossover rates to try")
+    parser.add_argument("--mutation-rate", type=float, nargs="+", help="mutation rates to try")
+    parser.add_argument("--convergence-num", type=int, nargs="+", help="convergence generation counts to try")
+    parser.add_argument("--scenarios", help="JSON file holding a list of parameter sets, used instead of the grid")
+    parser.add_argument("--seeds", type=int, nargs="+", default=[0], help="seeds to run each parameter set with")
+    parser.add_argument("--workers", type=int, help="number of worker processes, by default one per CPU")
+    parser.add_argument("--time-limit", type=float, help="number of seconds each run may take")
+    parser.add_argument("--max-generations", type=int, help="largest number of generations for each run")
+    parser.add_argument("--output", help="CSV file to write the results table to")
+    args = parser.parse_args()
+
+    if args.scenarios:
+        with open(args.scenarios) as file:
+            parameter_sets = json.load(file)
+    else:
+        grid = {name: values for name, values in (("population_size", args.population_size),
+                                                  ("crossover_rate", args.crossover_rate),
+                                                  ("mutation_rate", args.mutation_rate),
+                                                  ("convergence_num", args.convergence_num)) if values}
+        parameter_sets = BatchRunner.parameter_grid(grid)
+
+    runner = BatchRunner(parameter_sets, args.seeds, args.workers, args.time_limit, args.max_generations)
+    runner.run(progress=lambda row: print(f"Finished {row}"))
+    print(runner.format_table())
+    print(f"Total time: {runner.total_seconds:.1f} seconds")
+    if args.output:
+        runner.write_csv(args.output)
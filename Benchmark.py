@@ -0,0 +1,255 @@
+import argparse
+import contextlib
+import io
+import json
+import random
+import sys
+import time
+import numpy as np
+
+from Catalog import Catalog
+from Classroom import Classroom
+from Course import Course
+from GreedySolver import GreedySolver
+from IlpSolver import IlpSolver
+from Instructor import Instructor
+from Optimizer import Optimizer
+from TimeGrid import TimeGrid
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+"""
+Benchmark for measuring how the genetic algorithm scales with the size of the catalog being scheduled. Rather than
+using the two spreadsheets, a synthetic catalog is generated with a configurable number of classrooms, courses,
+instructors, and time slots, along with the distribution used for classroom seats and course enrollments. The following
+parts of the algorithm are then timed separately:
+  - form_population: creating the initial population
+  - calculate_fitness: scoring every schedule in the population, both one at a time and as a single batch
+  - form_next_generation: creating and selecting a single generation
+  - run_optimization: a full run until the algorithm converges
+  - solvers: the result of each chosen solver ("genetic", "greedy", or "ilp"), each given the same time limit
+
+The results are reported as JSON, including generations per second, individuals per second, the peak memory used by
+the process, and the best fitness score found against the wall-clock time taken to find it. The benchmark can be run
+from the command line, e.g. `py Benchmark.py --courses 2000 --classrooms 300 --solvers greedy ilp --output results.json`.
+
+Author: Ryan Johnson
+"""
+
+
+class Benchmark:
+    SIZE_DISTRIBUTIONS = ("uniform", "lognormal")
+    SOLVERS = ("genetic", "greedy", "ilp")
+
+    def __init__(self, num_classrooms=32, num_courses=218, num_instructors=99, monday_time_slots=10,
+                 tuesday_time_slots=7, size_distribution="uniform", population_size=500, num_generations=20,
+                 workers=1, seed=0, full_run=True, solvers=(), solver_time_limit=None):
+        if size_distribution not in self.SIZE_DISTRIBUTIONS:
+            raise ValueError(f"Unknown size distribution '{size_distribution}', expected one of "
+                             f"{self.SIZE_DISTRIBUTIONS}")
+        for solver in solvers:
+            if solver not in self.SOLVERS:
+                raise ValueError(f"Unknown solver '{solver}', expected one of {self.SOLVERS}")
+        self.num_classrooms = num_classrooms
+        self.num_courses = num_courses
+        self.num_instructors = num_instructors
+        self.monday_time_slots = monday_time_slots
+        self.tuesday_time_slots = tuesday_time_slots
+        self.size_distribution = size_distribution
+        self.population_size = population_size
+        self.num_generations = num_generations
+        self.workers = workers
+        self.seed = seed
+        self.full_run = full_run
+        self.solvers = list(solvers)
+        self.solver_time_limit = solver_time_limit
+
+    def random_sizes(self, rng, count, low, high):
+        """
+        Draws random classroom or course sizes from the benchmark's size distribution.
+
+        :param rng: NumPy random number generator
+        :param count: number of sizes to draw
+        :param low: smallest allowed size
+        :param high: largest allowed size
+        :return: array of integer sizes between low and high
+        """
+        if self.size_distribution == "uniform":
+            return rng.integers(low, high + 1, count)
+        # Most rooms and courses are small, with a long tail of larger ones
+        sizes = rng.lognormal(mean=np.log(low * 2), sigma=0.6, size=count)
+        return np.clip(np.rint(sizes), low, high).astype(int)
+
+    def generate_catalog(self):
+        """
+        Creates a synthetic catalog of classrooms, courses, and instructors. Every course fits in at least the largest
+        classroom and is taught by a random instructor, who is linked to each of the courses they teach. The catalog uses
+        the MWF and Tth time grid, resized to the benchmark's number of time slots.
+
+        :return: Catalog object holding the generated data
+        """
+        rng = np.random.default_rng(self.seed)
+        classroom_sizes = self.random_sizes(rng, self.num_classrooms, 10, 150)
+        classroom_list = [Classroom(f"ROOM-{index}", int(size)) for index, size in enumerate(classroom_sizes)]
+
+        instructor_list = [Instructor(f"Instructor {index}") for index in range(self.num_instructors)]
+        course_sizes = self.random_sizes(rng, self.num_courses, 5, int(classroom_sizes.max()))
+        course_instructors = rng.integers(0, self.num_instructors, self.num_courses)
+
+        course_list = []
+        for index, (size, instructor_index) in enumerate(zip(course_sizes, course_instructors)):
+            instructor = instructor_list[instructor_index]
+            course = Course(f"Course {index}", float(size), instructor)
+            instructor.courses.append(course)
+            course_list.append(course)
+        time_grid = TimeGrid.default(self.monday_time_slots, self.tuesday_time_slots)
+        return Catalog(course_list, classroom_list, instructor_list, time_grid)
+
+    @staticmethod
+    def peak_memory():
+        """
+        Finds the peak resident memory used by the process so far.
+
+        :return: peak resident set size in megabytes, or None if it can't be measured on this platform
+        """
+        if resource is None:
+            return None
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports kilobytes, while macOS reports bytes
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+    def create_solver(self, name, catalog):
+        """
+        Creates one of the solvers compared by the benchmark.
+
+        :param name: name of the solver, one of SOLVERS
+        :param catalog: Catalog object to be scheduled
+        :return: Solver object for the catalog
+        """
+        if name == "greedy":
+            return GreedySolver(catalog)
+        if name == "ilp":
+            return IlpSolver(catalog, threads=self.workers)
+        return Optimizer(catalog=catalog, population_size=self.population_size, workers=self.workers, seed=self.seed)
+
+    def run(self):
+        """
+        Runs every part of the benchmark.
+
+        :return: dictionary holding the benchmark settings and results
+        """
+        random.seed(self.seed)
+        return self.run_phases()
+
+    def run_phases(self):
+        """
+        Times each part of the algorithm on a synthetic catalog.
+
+        :return: dictionary holding the benchmark settings and results
+        """
+        results = {"settings": {key: value for key, value in vars(self).items()}, "phases": {}}
+        phases = results["phases"]
+
+        start = time.perf_counter()
+        catalog = self.generate_catalog()
+        phases["generate_catalog"] = {"seconds": time.perf_counter() - start}
+
+        optimizer = Optimizer(catalog=catalog, population_size=0, workers=self.workers, seed=self.seed)
+        optimizer.POPULATION_SIZE = self.population_size
+
+        start = time.perf_counter()
+        optimizer.population = optimizer.form_population(self.population_size)
+        elapsed = time.perf_counter() - start
+        phases["form_population"] = {"seconds": elapsed, "individuals_per_second": self.population_size / elapsed}
+
+        # Score each schedule individually, then the whole population as a single batch
+        start = time.perf_counter()
+        for schedule in optimizer.population:
+            schedule.fitness = None
+            optimizer.calculate_fitness(schedule)
+        elapsed = time.perf_counter() - start
+        phases["calculate_fitness"] = {"seconds": elapsed, "individuals_per_second": self.population_size / elapsed}
+
+        genomes = np.stack([schedule.genome for schedule in optimizer.population])
+        start = time.perf_counter()
+        optimizer.evaluate_population(genomes)
+        elapsed = time.perf_counter() - start
+        phases["evaluate_population"] = {"seconds": elapsed, "individuals_per_second": self.population_size / elapsed}
+
+        # Record the best fitness score found against the wall-clock time of each generation
+        curve = []
+        start = time.perf_counter()
+        for generation in range(self.num_generations):
+            optimizer.form_next_generation()
+            best_fitness = optimizer.calculate_fitness(optimizer.population[0])
+            curve.append({"generation": generation + 1, "seconds": time.perf_counter() - start,
+                          "best_fitness": float(best_fitness)})
+        elapsed = time.perf_counter() - start
+        phases["form_next_generation"] = {
+            "seconds": elapsed,
+            "generations_per_second": self.num_generations / elapsed,
+            "individuals_per_second": self.num_generations * self.population_size / elapsed,
+            "best_fitness_curve": curve,
+        }
+
+        optimizer.close()
+
+        if self.full_run:
+            # A fresh optimizer keeps the generations and best schedule of the timed loop above out of the full run
+            optimizer = Optimizer(catalog=catalog, population_size=self.population_size, workers=self.workers,
+                                  seed=self.seed)
+            start_generation = optimizer.generation_num
+            start = time.perf_counter()
+            # The per-generation progress and final schedule printed by run_optimization aren't needed here
+            with contextlib.redirect_stdout(io.StringIO()):
+                optimizer.run_optimization()
+            elapsed = time.perf_counter() - start
+            num_generations = optimizer.generation_num - start_generation
+            phases["run_optimization"] = {
+                "seconds": elapsed,
+                "generations": num_generations,
+                "generations_per_second": num_generations / elapsed,
+                "best_fitness": float(optimizer.get_best()[0]),
+            }
+            optimizer.close()
+
+        if self.solvers:
+            phases["solvers"] = [self.create_solver(name, catalog).solve(self.solver_time_limit).summary()
+                                 for name in self.solvers]
+
+        results["peak_rss_mb"] = self.peak_memory()
+        return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the genetic algorithm on a synthetic catalog.")
+    parser.add_argument("--classrooms", type=int, default=32, help="number of classrooms")
+    parser.add_argument("--courses", type=int, default=218, help="number of courses")
+    parser.add_argument("--instructors", type=int, default=99, help="number of instructors")
+    parser.add_argument("--monday-slots", type=int, default=10, help="number of MWF time slots")
+    parser.add_argument("--tuesday-slots", type=int, default=7, help="number of Tth time slots")
+    parser.add_argument("--size-distribution", choices=Benchmark.SIZE_DISTRIBUTIONS, default="uniform",
+                        help="distribution of classroom seats and course enrollments")
+    parser.add_argument("--population", type=int, default=500, help="number of schedules in the population")
+    parser.add_argument("--generations", type=int, default=20, help="number of generations to time")
+    parser.add_argument("--workers", type=int, default=1, help="number of worker processes")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the catalog and the algorithm")
+    parser.add_argument("--skip-full-run", action="store_true", help="don't time a full run_optimization")
+    parser.add_argument("--solvers", nargs="*", choices=Benchmark.SOLVERS, default=[],
+                        help="solvers to compare on the synthetic catalog")
+    parser.add_argument("--solver-time-limit", type=float, help="number of seconds each solver may run for")
+    parser.add_argument("--output", help="file to write the JSON results to, instead of printing them")
+    args = parser.parse_args()
+
+    benchmark = Benchmark(args.classrooms, args.courses, args.instructors, args.monday_slots, args.tuesday_slots,
+                          args.size_distribution, args.population, args.generations, args.workers, args.seed,
+                          not args.skip_full_run, args.solvers, args.solver_time_limit)
+    report = json.dumps(benchmark.run(), indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(report)
+    else:
+        print(report)
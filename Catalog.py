@@ -0,0 +1,87 @@
+import numpy as np
+
+from TimeGrid import TimeGrid
+
+"""
+Class for representing the course, classroom, and instructor data shared by every schedule within the genetic algorithm.
+This data is never modified while the algorithm is running, so a single catalog is created for each run and referenced
+by every schedule in the population rather than being copied into each of them. Alongside the original object lists,
+the number of students enrolled in each course, the number of seats in each classroom, and the instructor teaching each
+course are stored as NumPy arrays, allowing genomes to be checked without looking up the underlying objects.
+
+The catalog also holds an index of which classrooms each course fits in. The classrooms are sorted by their number of
+seats, so the classrooms large enough for a course always form a single slice at the end of the sorted list, starting
+at the first classroom with at least as many seats as students enrolled in the course. This index is built once per
+run and lets a feasible classroom be chosen for a course without checking every classroom.
+
+Finally, the catalog holds the time grid courses are scheduled in, along with any weighted constraints. Each constraint
+is compiled into the catalog's dense course/time slot and course/classroom penalty matrices when the catalog is created.
+
+Author: Ryan Johnson
+"""
+
+
+class Catalog:
+    def __init__(self, course_list, classroom_list, instructor_list, time_grid=None, constraints=()):
+        self.course_list = course_list
+        self.classroom_list = classroom_list
+        self.instructor_list = instructor_list
+        self.time_grid = time_grid if time_grid is not None else TimeGrid.default()
+        self.constraints = list(constraints)
+
+        self.course_enrollments = np.array([course.enrolled for course in course_list], dtype=float)
+        self.classroom_sizes = np.array([classroom.size for classroom in classroom_list], dtype=float)
+
+        # Index of the instructor teaching each course, or -1 if the course has no instructor in the instructor list
+        instructor_positions = {id(instructor): index for index, instructor in enumerate(instructor_list)}
+        self.course_instructors = np.array([instructor_positions.get(id(course.instructor), -1)
+                                            for course in course_list], dtype=np.int64)
+
+        # Classrooms sorted from fewest to most seats, along with each classroom's position in the sorted list
+        self.classrooms_by_size = np.argsort(self.classroom_sizes, kind="stable")
+        self.classroom_ranks = np.empty(len(classroom_list), dtype=np.int64)
+        self.classroom_ranks[self.classrooms_by_size] = np.arange(len(classroom_list))
+        # Position of the smallest classroom each course fits in. A course with an unknown enrollment fits anywhere.
+        self.course_first_fits = np.searchsorted(self.classroom_sizes[self.classrooms_by_size], self.course_enrollments)
+        self.course_first_fits[np.isnan(self.course_enrollments)] = 0
+
+        # Time slots that can't both be used by the same classroom or instructor, with each pair only counted once
+        self.slot_overlaps = self.time_grid.overlaps
+        self.has_overlaps = bool(self.slot_overlaps.any())
+        self.upper_slot_overlaps = np.triu(self.slot_overlaps).astype(np.int64)
+
+        # Penalty for placing each course in each time slot and in each classroom, added to by the constraints
+        num_courses = len(course_list)
+        self.course_slot_penalties = np.zeros((num_courses, self.time_grid.num_time_slots))
+        self.course_classroom_penalties = np.zeros((num_courses, len(classroom_list)))
+        for constraint in self.constraints:
+            constraint.apply(self)
+        self.has_placement_penalties = bool(self.course_slot_penalties.any() or self.course_classroom_penalties.any())
+
+    def feasible_classrooms(self, course_index):
+        """
+        Finds every classroom with enough seats for a course.
+
+        :param course_index: index of the course within the course list
+        :return: array of classroom indices, sorted from fewest to most seats
+        """
+        return self.classrooms_by_size[self.course_first_fits[course_index]:]
+
+    def course_fits(self, course_indices, classroom_index):
+        """
+        Determines which courses fit within a single classroom.
+
+        :param course_indices: array of course indices within the course list
+        :param classroom_index: index of the classroom to be checked
+        :return: boolean array, True for each course with no more students enrolled than the classroom has seats
+        """
+        return self.course_first_fits[course_indices] <= self.classroom_ranks[classroom_index]
+
+    def course_name(self, course_index):
+        """
+        Finds the name of the course stored at a single position within a genome.
+
+        :param course_index: index of the course within the course list, or -1 for an empty time slot
+        :return: name of the course, or "N/A" if no course is held during the time slot
+        """
+        return "N/A" if course_index == -1 else str(self.course_list[course_index])
@@ -0,0 +1,118 @@
+import hashlib
+import os
+import random
+import numpy as np
+
+from AtomicWrite import atomic_write
+from Schedule import Schedule
+
+"""
+Class for saving the state of a running genetic algorithm to disk and restoring it later, so that a long run can be
+stopped and resumed without losing the generations already computed. Each checkpoint is a single compressed NumPy file
+holding:
+  - The genome and fitness score of every schedule in the population
+  - The state of the random number generator
+  - The generation number and the average fitness score of every generation so far
+  - A fingerprint of the catalog, so a checkpoint is never restored against different course or classroom data
+
+Each save replaces the previous checkpoint, so the file always holds the latest generation. The file is written to a
+temporary location first, so an interrupted save never corrupts the previous checkpoint.
+
+Author: Ryan Johnson
+"""
+
+
+class Checkpoint:
+    def __init__(self, path="checkpoint.npz"):
+        self.path = path
+
+    def exists(self):
+        """
+        Determines whether a checkpoint has been saved.
+
+        :return: True if the checkpoint file exists; False otherwise
+        """
+        return os.path.exists(self.path)
+
+    @staticmethod
+    def catalog_fingerprint(catalog):
+        """
+        Creates a fingerprint identifying the courses and classrooms being scheduled.
+
+        :param catalog: catalog to be identified
+        :return: hexadecimal hash of the course and classroom names, seat counts, enrollments, and time slots
+        """
+        fingerprint = hashlib.sha256()
+        fingerprint.update(catalog.time_grid.description().encode())
+        for classroom in catalog.classroom_list:
+            fingerprint.update(f"{classroom.name}:{classroom.size};".encode())
+        for course in catalog.course_list:
+            fingerprint.update(f"{course.name}:{course.enrolled};".encode())
+        return fingerprint.hexdigest()
+
+    def save(self, optimizer):
+        """
+        Saves the population, random state, and convergence history of an optimizer.
+
+        :param optimizer: Optimizer object to be saved
+        """
+        version, internal_state, gauss_next = random.getstate()
+        genomes = np.stack([schedule.genome for schedule in optimizer.population])
+        fitness_scores = np.array([optimizer.calculate_fitness(schedule) for schedule in optimizer.population])
+
+        with atomic_write(self.path, "wb") as file:
+            np.savez_compressed(file, genomes=genomes, fitness=fitness_scores,
+                                random_version=version, random_state=np.array(internal_state, dtype=np.uint64),
+                                random_gauss=np.nan if gauss_next is None else gauss_next,
+                                generation=optimizer.generation_num,
+                                fitness_history=np.array(optimizer.fitness_history, dtype=float),
+                                catalog=self.catalog_fingerprint(optimizer.catalog))
+
+    def read(self):
+        """
+        Loads the saved checkpoint without applying it to an optimizer.
+
+        :return: dictionary of the arrays stored in the checkpoint
+        """
+        with np.load(self.path, allow_pickle=False) as checkpoint:
+            return dict(checkpoint)
+
+    def read_for(self, catalog):
+        """
+        Loads the saved checkpoint, making sure it was saved for the given catalog.
+
+        :param catalog: catalog the checkpoint should have been saved for
+        :return: dictionary of the arrays stored in the checkpoint
+        """
+        checkpoint = self.read()
+        if str(checkpoint["catalog"]) != self.catalog_fingerprint(catalog):
+            raise ValueError(f"Checkpoint '{self.path}' was saved for a different set of courses and classrooms")
+        return checkpoint
+
+    def best_schedule(self, catalog):
+        """
+        Loads the most fit schedule saved in the checkpoint.
+
+        :param catalog: catalog the checkpoint was saved for
+        :return: Schedule object with the highest saved fitness score
+        """
+        checkpoint = self.read_for(catalog)
+        best_index = int(np.argmax(checkpoint["fitness"]))
+        return Schedule.from_genome(catalog, checkpoint["genomes"][best_index], float(checkpoint["fitness"][best_index]))
+
+    def restore(self, optimizer):
+        """
+        Replaces the population, random state, and convergence history of an optimizer with the saved checkpoint.
+
+        :param optimizer: Optimizer object to be restored
+        """
+        checkpoint = self.read_for(optimizer.catalog)
+        optimizer.population = [Schedule.from_genome(optimizer.catalog, genome, fitness)
+                                for genome, fitness in zip(checkpoint["genomes"], checkpoint["fitness"])]
+        optimizer.population_fitness = checkpoint["fitness"].astype(float)
+        optimizer.generation_num = int(checkpoint["generation"])
+        optimizer.fitness_history = checkpoint["fitness_history"].tolist()
+
+        gauss_next = float(checkpoint["random_gauss"])
+        random.setstate((int(checkpoint["random_version"]), tuple(int(value) for value in checkpoint["random_state"]),
+                         None if np.isnan(gauss_next) else gauss_next))
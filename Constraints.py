@@ -0,0 +1,114 @@
+import numpy as np
+
+"""
+Weighted constraints that can be added to the catalog on top of the penalties built into the fitness function. Each
+constraint is compiled once, when the catalog is created, into one of two dense penalty matrices held by the catalog:
+  - course_slot_penalties: the penalty for holding each course during each time slot
+  - course_classroom_penalties: the penalty for holding each course in each classroom
+A schedule is penalized by the sum of these matrices over every course it places, so the fitness function stays a
+single vectorized lookup no matter how many constraints are added. The following constraints are available:
+  - instructor_unavailability: an instructor can't teach on the given days between two times
+  - room_features: courses needing a feature, such as a lab or projector, must be held in a classroom that has it
+  - capacity_slack: courses shouldn't be held in classrooms with many more seats than students
+
+New constraints only need an apply(catalog) method adding their penalties to the catalog's matrices. Constraints can
+also be listed in the configuration file, each as a dictionary with a "type" key naming the constraint and the rest of
+its keys passed to the constraint, e.g.
+    {"type": "instructor_unavailability", "instructor": "J. Fregulia", "days": ["M", "W", "F"],
+     "start_time": "8:00AM", "end_time": "10:00AM", "weight": 0.5}
+
+Author: Ryan Johnson
+"""
+
+
+class InstructorUnavailability:
+    def __init__(self, instructor, days, start_time, end_time, weight=1.0):
+        self.instructor = instructor
+        self.days = days
+        self.start_time = start_time
+        self.end_time = end_time
+        self.weight = weight
+
+    def apply(self, catalog):
+        """
+        Penalizes every course taught by the instructor during each time slot meeting while they are unavailable.
+
+        :param catalog: Catalog object whose penalty matrices are updated
+        """
+        instructor_indices = [index for index, instructor in enumerate(catalog.instructor_list)
+                              if instructor.name == self.instructor]
+        courses = np.flatnonzero(np.isin(catalog.course_instructors, instructor_indices))
+        time_slots = catalog.time_grid.slots_during(self.days, self.start_time, self.end_time)
+        catalog.course_slot_penalties[np.ix_(courses, time_slots)] += self.weight
+
+
+class RoomFeatures:
+    def __init__(self, course_features, classroom_features, weight=1.0):
+        self.course_features = course_features
+        self.classroom_features = classroom_features
+        self.weight = weight
+
+    def apply(self, catalog):
+        """
+        Penalizes holding a course in any classroom missing one of the features the course needs. Courses are matched by
+        name and classrooms by name, e.g. SIMP-120.
+
+        :param catalog: Catalog object whose penalty matrices are updated
+        """
+        features = sorted({feature for needed in self.course_features.values() for feature in needed})
+        feature_indices = {feature: index for index, feature in enumerate(features)}
+        needed = np.zeros((len(catalog.course_list), len(features)), dtype=bool)
+        for course_index, course in enumerate(catalog.course_list):
+            for feature in self.course_features.get(course.name, ()):
+                needed[course_index, feature_indices[feature]] = True
+        available = np.zeros((len(catalog.classroom_list), len(features)), dtype=bool)
+        for classroom_index, classroom in enumerate(catalog.classroom_list):
+            for feature in self.classroom_features.get(classroom.name, ()):
+                if feature in feature_indices:
+                    available[classroom_index, feature_indices[feature]] = True
+
+        # A classroom is missing a feature when the course needs it and the classroom doesn't have it
+        missing = needed.astype(np.int32) @ (~available).astype(np.int32).T > 0
+        catalog.course_classroom_penalties += self.weight * missing
+
+
+class CapacitySlack:
+    def __init__(self, max_empty_fraction=0.5, weight=1.0):
+        self.max_empty_fraction = max_empty_fraction
+        self.weight = weight
+
+    def apply(self, catalog):
+        """
+        Penalizes holding a course in a classroom where more than max_empty_fraction of the seats are empty, in
+        proportion to the fraction of seats left empty beyond that. Courses with an unknown enrollment aren't penalized.
+
+        :param catalog: Catalog object whose penalty matrices are updated
+        """
+        with np.errstate(divide="ignore", invalid="ignore"):
+            empty_fraction = 1 - catalog.course_enrollments[:, np.newaxis] / catalog.classroom_sizes[np.newaxis]
+        excess = np.nan_to_num(np.clip(empty_fraction - self.max_empty_fraction, 0, None), nan=0.0, posinf=0.0)
+        catalog.course_classroom_penalties += self.weight * excess
+
+
+CONSTRAINT_TYPES = {
+    "instructor_unavailability": InstructorUnavailability,
+    "room_features": RoomFeatures,
+    "capacity_slack": CapacitySlack,
+}
+
+
+def create_constraints(entries):
+    """
+    Creates constraints from their descriptions in a configuration file.
+
+    :param entries: list of dictionaries, each with a "type" key naming the constraint and its remaining arguments
+    :return: list of constraint objects
+    """
+    constraints = []
+    for entry in entries:
+        arguments = dict(entry)
+        constraint_type = arguments.pop("type", None)
+        if constraint_type not in CONSTRAINT_TYPES:
+            raise ValueError(f"Unknown constraint type '{constraint_type}', expected one of {list(CONSTRAINT_TYPES)}")
+        constraints.append(CONSTRAINT_TYPES[constraint_type](**arguments))
+    return constraints
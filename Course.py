@@ -1,17 +1,21 @@
 """
 Class for representing a single course within the genetic algorithm. Each course has a name, instructor, and the number
 of students enrolled. Each course is assigned to a specific time block in a classroom containing at least as many seats
-as the number of students enrolled.
+as the number of students enrolled. If known, the classroom, start time, and meeting days the course is currently
+scheduled for are also kept, allowing schedules to be started from the current room assignments.
 
 Author: Ryan Johnson
 """
 
 
 class Course:
-    def __init__(self, name, enrolled, instructor):
+    def __init__(self, name, enrolled, instructor, current_classroom=None, current_start_time=None, current_days=None):
         self.name = name
         self.enrolled = enrolled
         self.instructor = instructor
+        self.current_classroom = current_classroom
+        self.current_start_time = current_start_time
+        self.current_days = current_days
 
     def __str__(self):
         return self.name
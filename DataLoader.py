@@ -0,0 +1,201 @@
+import hashlib
+import json
+import os
+import numpy as np
+import pandas as pd
+
+from AtomicWrite import atomic_write
+from Classroom import Classroom
+from Constraints import create_constraints
+from Course import Course
+from Instructor import Instructor
+from TimeGrid import TimeGrid
+
+"""
+Class for loading the classroom and course data used by the genetic algorithm. Only the columns needed for scheduling
+are read from the two Excel spreadsheets, and the rows are filtered with vectorized pandas operations rather than one
+row at a time. Note that only classrooms with a known number of seats are used. Similarly, only lecture courses
+currently located in rooms with a known number of seats are used.
+
+Since parsing the spreadsheets takes far longer than the rest of the loading, the filtered data is saved to a binary
+NumPy cache. Each spreadsheet's modification time, size, and SHA-256 hash are stored alongside the data. On later runs,
+the cache is used as long as every spreadsheet still matches, with the hash only being recalculated when a
+spreadsheet's modification time or size has changed. Otherwise, the spreadsheets are parsed again and the cache is
+rebuilt.
+
+The time grid and any weighted constraints are read from a small JSON configuration file, config/scheduling.json, with a
+"time_grid" section described in the TimeGrid module and a "constraints" list described in the Constraints module.
+Without a configuration file, the MWF and Tth grid is used with no extra constraints.
+
+Author: Ryan Johnson
+"""
+
+
+class DataLoader:
+    # Increased whenever the cached arrays change, so caches written by older versions are rebuilt
+    CACHE_VERSION = 3
+    CLASSROOM_COLUMNS = ["Building Name", "Room Number", "Number of Student Seats in Room"]
+    COURSE_COLUMNS = ["SEC_SHORT_TITLE", "CSM_BLDG", "CSM_ROOM", "CSM_INSTR_METHOD", "SEC_FACULTY_INFO",
+                      "SEC_CAPACITY", "CSM_START_TIME", "CSM_MONDAY", "CSM_TUESDAY"]
+
+    def __init__(self, classroom_path="excel/classroom_info.xlsx", course_path="excel/schedule.xlsx",
+                 cache_path="excel/data_cache.npz", config_path="config/scheduling.json"):
+        self.classroom_path = classroom_path
+        self.course_path = course_path
+        self.cache_path = cache_path
+        self.config_path = config_path
+
+    def load(self):
+        """
+        Creates the classroom, course, and instructor objects for scheduling, using the cache if it is still valid.
+
+        :return: list containing three sublists - classrooms, courses, and instructors
+        """
+        data = self.read_cache()
+        if data is None:
+            data = self.read_spreadsheets()
+            self.write_cache(data)
+        return self.build_objects(data)
+
+    def load_config(self):
+        """
+        Reads the time grid and weighted constraints from the configuration file.
+
+        :return: TimeGrid object and list of constraint objects, being the default grid and no constraints if there is
+                 no configuration file
+        """
+        if self.config_path is None or not os.path.exists(self.config_path):
+            return TimeGrid.default(), []
+        with open(self.config_path) as file:
+            config = json.load(file)
+        time_grid = TimeGrid.from_dict(config["time_grid"]) if "time_grid" in config else TimeGrid.default()
+        return time_grid, create_constraints(config.get("constraints", []))
+
+    def read_spreadsheets(self):
+        """
+        Reads the needed columns from both spreadsheets, keeping only classrooms of known size and the lecture courses
+        currently held in them.
+
+        :return: dictionary of NumPy arrays holding the classroom and course data
+        """
+        classroom_data = pd.read_excel(self.classroom_path, engine="openpyxl", usecols=self.CLASSROOM_COLUMNS)
+        course_data = pd.read_excel(self.course_path, engine="openpyxl", usecols=self.COURSE_COLUMNS)
+        course_data = course_data.dropna(subset=["CSM_BLDG", "CSM_ROOM"])
+
+        # A room listed more than once keeps the seat count from its last listing
+        room_names = classroom_data["Building Name"] + "-" + classroom_data["Room Number"].astype(str)
+        room_sizes = pd.Series(classroom_data["Number of Student Seats in Room"].to_numpy(), index=room_names)
+        room_sizes = room_sizes.groupby(level=0, sort=False).last()
+
+        # Only use lecture courses in classrooms of known size
+        course_rooms = course_data["CSM_BLDG"] + "-" + course_data["CSM_ROOM"].astype(str)
+        lectures = (course_data["CSM_INSTR_METHOD"] == "LEC") & course_rooms.isin(room_sizes.index)
+        course_data = course_data[lectures]
+        course_rooms = course_rooms[lectures]
+
+        # Courses meeting on Monday are MWF courses, while courses meeting on Tuesday are Tth courses
+        course_days = np.where(course_data["CSM_MONDAY"] == "Y", "MWF",
+                               np.where(course_data["CSM_TUESDAY"] == "Y", "TTH", ""))
+
+        return {
+            "classroom_names": room_sizes.index.to_numpy(dtype=str),
+            "classroom_sizes": room_sizes.to_numpy(),
+            "course_names": course_data["SEC_SHORT_TITLE"].to_numpy(dtype=str),
+            "course_enrollments": course_data["SEC_CAPACITY"].to_numpy(dtype=float),
+            "course_instructors": course_data["SEC_FACULTY_INFO"].fillna("").to_numpy(dtype=str),
+            "course_rooms": course_rooms.to_numpy(dtype=str),
+            "course_start_times": course_data["CSM_START_TIME"].fillna("").to_numpy(dtype=str),
+            "course_days": course_days.astype(str),
+        }
+
+    def build_objects(self, data):
+        """
+        Creates the classroom, course, and instructor objects from the loaded data. A single instructor object is created
+        for each instructor, shared by every course they teach and holding a list of those courses. Courses without a
+        listed instructor aren't linked to any instructor.
+
+        :param data: dictionary of NumPy arrays holding the classroom and course data
+        :return: list containing three sublists - classrooms, courses, and instructors
+        """
+        classrooms_list = [Classroom(str(name), size.item())
+                           for name, size in zip(data["classroom_names"], data["classroom_sizes"])]
+
+        courses_list = []
+        instructors_dict = {}
+        for name, enrolled, instructor_name, room, start_time, days in zip(
+                data["course_names"], data["course_enrollments"], data["course_instructors"], data["course_rooms"],
+                data["course_start_times"], data["course_days"]):
+            instructor_name = str(instructor_name)
+            # Create a new instructor if not already in the dictionary
+            instructor = None
+            if instructor_name:
+                if instructor_name not in instructors_dict:
+                    instructors_dict[instructor_name] = Instructor(instructor_name)
+                instructor = instructors_dict[instructor_name]
+
+            course = Course(str(name), enrolled.item(), instructor, str(room), str(start_time), str(days))
+            courses_list.append(course)
+            if instructor is not None:
+                instructor.courses.append(course)
+        instructors_list = list(instructors_dict.values())
+        return classrooms_list, courses_list, instructors_list
+
+    def source_signatures(self, previous=None):
+        """
+        Finds the modification time, size, and hash of each spreadsheet. If a spreadsheet's modification time and size
+        match a previously stored signature, the stored hash is reused rather than reading the whole file again.
+
+        :param previous: array of previously stored signatures, or None
+        :return: array holding the path, modification time, size, and hash of each spreadsheet
+        """
+        signatures = []
+        for index, path in enumerate((self.classroom_path, self.course_path)):
+            stat = os.stat(path)
+            mtime, size = str(stat.st_mtime_ns), str(stat.st_size)
+            if previous is not None and tuple(previous[index][:3]) == (path, mtime, size):
+                file_hash = str(previous[index][3])
+            else:
+                with open(path, "rb") as file:
+                    file_hash = hashlib.sha256(file.read()).hexdigest()
+            signatures.append([path, mtime, size, file_hash])
+        return np.array(signatures, dtype=str)
+
+    def read_cache(self):
+        """
+        Loads the cached data if it was created from the current versions of both spreadsheets.
+
+        :return: dictionary of NumPy arrays holding the classroom and course data, or None if the cache is missing or out
+                 of date
+        """
+        if not os.path.exists(self.cache_path):
+            return None
+        try:
+            with np.load(self.cache_path, allow_pickle=False) as cache:
+                data = dict(cache)
+        except (OSError, ValueError):
+            return None
+
+        stored = data.pop("sources", None)
+        version = data.pop("version", None)
+        if stored is None or stored.shape != (2, 4) or version != self.CACHE_VERSION:
+            return None
+        current = self.source_signatures(stored)
+        # Any spreadsheet with new contents invalidates the cache
+        if not np.array_equal(current[:, [0, 3]], stored[:, [0, 3]]):
+            return None
+        # Refresh the stored modification times when only the timestamps have changed
+        if not np.array_equal(current, stored):
+            self.write_cache(data, current)
+        return data
+
+    def write_cache(self, data, signatures=None):
+        """
+        Saves the loaded data to the cache, along with the signature of each spreadsheet it was loaded from.
+
+        :param data: dictionary of NumPy arrays holding the classroom and course data
+        :param signatures: signatures of the spreadsheets, found again if not provided
+        """
+        if signatures is None:
+            signatures = self.source_signatures()
+        with atomic_write(self.cache_path, "wb") as file:
+            np.savez(file, sources=signatures, version=self.CACHE_VERSION, **data)
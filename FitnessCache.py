@@ -0,0 +1,83 @@
+import hashlib
+import sys
+from collections import OrderedDict
+
+"""
+Class for remembering the fitness scores of genomes that have already been evaluated. Genomes are keyed by a 128-bit
+BLAKE2 hash of their contents, so a schedule identical to one seen before is never scored twice, even when it was
+created separately rather than copied. Once the cache reaches its memory cap, the least recently used scores are evicted
+first. The number of hits, misses, and evictions are kept, giving the hit rate of the cache.
+
+Author: Ryan Johnson
+"""
+
+
+class FitnessCache:
+    # Approximate memory used by each entry: the hash key, the fitness score, and the dictionary entry holding them
+    ENTRY_BYTES = sys.getsizeof(bytes(16)) + sys.getsizeof(0.0) + 100
+
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.max_entries = max_bytes // self.ENTRY_BYTES
+        self.scores = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(genome):
+        """
+        Hashes the contents of a genome.
+
+        :param genome: schedule genome to be hashed
+        :return: 16-byte digest of the genome
+        """
+        return hashlib.blake2b(genome.tobytes(), digest_size=16).digest()
+
+    def get(self, key):
+        """
+        Looks up the fitness score of a genome, marking it as recently used.
+
+        :param key: hash of the genome from key()
+        :return: fitness score of the genome, or None if it isn't in the cache
+        """
+        fitness = self.scores.get(key)
+        if fitness is None:
+            self.misses += 1
+            return None
+        self.scores.move_to_end(key)
+        self.hits += 1
+        return fitness
+
+    def put(self, key, fitness):
+        """
+        Stores the fitness score of a genome, evicting the least recently used scores if the cache is full.
+
+        :param key: hash of the genome from key()
+        :param fitness: fitness score of the genome
+        """
+        if self.max_entries <= 0:
+            return
+        self.scores[key] = fitness
+        self.scores.move_to_end(key)
+        while len(self.scores) > self.max_entries:
+            self.scores.popitem(last=False)
+            self.evictions += 1
+
+    def hit_rate(self):
+        """
+        Finds the fraction of lookups that found a fitness score.
+
+        :return: hit rate of the cache, or None if no lookups have been made
+        """
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else None
+
+    def stats(self):
+        """
+        Summarizes how the cache has been used.
+
+        :return: dictionary holding the number of entries, hits, misses, and evictions, along with the hit rate
+        """
+        return {"entries": len(self.scores), "hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "hit_rate": self.hit_rate(), "approximate_bytes": len(self.scores) * self.ENTRY_BYTES}
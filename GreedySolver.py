@@ -0,0 +1,49 @@
+import time
+import numpy as np
+
+from LocalSearch import LocalSearch
+from Schedule import Schedule
+from Solver import Solver, SolverResult
+
+"""
+Class for building a course schedule with a first-fit-decreasing packer. Courses are placed one at a time, from the
+largest enrollment to the smallest, each into the smallest classroom already in use that has enough seats and a time
+block free for the course's instructor. A new classroom is only opened, again the smallest that fits, when no classroom
+in use can take the course. The packer never creates instructor conflicts or duplicated courses, so it only misses a
+course when no classroom has a suitable time block left. Being deterministic and taking only a single pass over the
+courses, it gives a fast baseline for the genetic algorithm to beat.
+
+Author: Ryan Johnson
+"""
+
+
+class GreedySolver(Solver):
+    NAME = "greedy"
+
+    def __init__(self, catalog):
+        self.catalog = catalog
+        self.local_search = LocalSearch(catalog)
+
+    def solve(self, time_limit=None):
+        """
+        Packs every course into the schedule in order of decreasing enrollment. The packer runs in a single pass, so the
+        time limit is ignored.
+
+        :param time_limit: unused, accepted for compatibility with the other solvers
+        :return: SolverResult holding the packed schedule
+        """
+        start = time.perf_counter()
+        schedule = Schedule(self.catalog)
+        schedule.ensure_tally()
+        # Courses with an unknown enrollment are placed last
+        order = np.argsort(-self.catalog.course_enrollments, kind="stable")
+        num_unplaced_courses = 0
+        for course_index in order:
+            placement = self.local_search.find_placement(schedule, course_index, first_free=True)
+            if placement is None:
+                num_unplaced_courses += 1
+                continue
+            schedule.place_course(*placement, course_index)
+
+        return SolverResult(self.NAME, schedule, schedule.fitness, time.perf_counter() - start, "complete",
+                            {"unplaced_courses": num_unplaced_courses})
@@ -0,0 +1,241 @@
+import time
+import numpy as np
+
+from GreedySolver import GreedySolver
+from Schedule import Schedule
+from Solver import Solver, SolverResult
+
+try:
+    import pulp
+except ImportError:
+    pulp = None
+
+"""
+Class for building a course schedule with an integer programming model, solved by the CBC solver that comes with PuLP.
+PuLP is optional and only needed for this solver; it can be installed with `pip install pulp`. The model has a binary
+variable for every course, classroom with enough seats for it, and time block, along with one for each classroom being
+in use and one for each course being left out:
+  - Every course is either placed exactly once or counted as missing
+  - Every time block of a classroom holds at most one course, and only if the classroom is in use
+  - No instructor teaches more than one course during a single time block
+  - Neither a classroom nor an instructor is used during two overlapping time slots of the time grid
+The model minimizes the number of classrooms in use, with each missing course costing more than every classroom
+combined, matching the priorities of the fitness function. Since every course is placed at most once, no course is held
+on both MWF and Tth.
+
+The fitness function counts the classrooms in use as 1/n, so once the catalog has weighted constraints, using fewer
+classrooms is only worth the penalties it adds while it raises 1/n by more. In that case the model is solved again for
+the fewest missing courses plus penalties, first without a limit on the classrooms and then for each smaller number of
+classrooms that could still beat the best schedule found, keeping the schedule with the highest fitness score.
+
+The solver is started from the greedy solver's schedule and stops once the time limit is reached, returning the best
+schedule found so far. A result with an "optimal" status has the highest fitness score of any schedule without
+instructor conflicts or overlapping time slots, giving an upper bound on the fitness score the genetic algorithm can
+reach.
+
+Author: Ryan Johnson
+"""
+
+
+class IlpSolver(Solver):
+    NAME = "ilp"
+    STATUSES = {1: "optimal", 2: "feasible", 0: "no_solution", -1: "infeasible", -2: "unbounded"}
+
+    def __init__(self, catalog, warm_start=True, threads=None, msg=False):
+        if pulp is None:
+            raise ImportError("IlpSolver requires PuLP, which can be installed with `pip install pulp`")
+        self.catalog = catalog
+        self.warm_start = warm_start
+        self.threads = threads
+        self.msg = msg
+
+    def build_model(self):
+        """
+        Creates the integer programming model for the catalog.
+
+        :return: PuLP problem, along with dictionaries mapping (course, classroom, time slot) index triples to placement
+                 variables, classroom indices to in-use variables, and course indices to missing-course variables, and
+                 the total penalty of the weighted constraints
+        """
+        catalog = self.catalog
+        num_classrooms = len(catalog.classroom_list)
+        num_time_slots = catalog.time_grid.num_time_slots
+        problem = pulp.LpProblem("classroom_schedule", pulp.LpMinimize)
+
+        in_use = {r: pulp.LpVariable(f"in_use_{r}", cat="Binary") for r in range(num_classrooms)}
+        missing = {c: pulp.LpVariable(f"missing_{c}", cat="Binary") for c in range(len(catalog.course_list))}
+        placements = {}
+        block_courses = {}
+        instructor_courses = {}
+        for course_index in range(len(catalog.course_list)):
+            instructor_index = int(catalog.course_instructors[course_index])
+            for classroom_index in catalog.feasible_classrooms(course_index):
+                for time_slot_index in range(num_time_slots):
+                    key = (course_index, int(classroom_index), time_slot_index)
+                    variable = pulp.LpVariable("place_{}_{}_{}".format(*key), cat="Binary")
+                    placements[key] = variable
+                    block_courses.setdefault(key[1:], []).append(variable)
+                    if instructor_index != -1:
+                        instructor_courses.setdefault((instructor_index, time_slot_index), []).append(variable)
+
+        # Any missing course outweighs using every classroom
+        penalties = []
+        if catalog.has_placement_penalties:
+            for (course_index, classroom_index, time_slot_index), variable in placements.items():
+                penalty = catalog.course_slot_penalties[course_index, time_slot_index] + \
+                    catalog.course_classroom_penalties[course_index, classroom_index]
+                if penalty:
+                    penalties.append(float(penalty) * variable)
+        problem += pulp.lpSum(in_use.values()) + (num_classrooms + 1) * pulp.lpSum(missing.values())
+
+        course_placements = {}
+        for (course_index, _, _), variable in placements.items():
+            course_placements.setdefault(course_index, []).append(variable)
+        for course_index, variable in missing.items():
+            problem += pulp.lpSum(course_placements.get(course_index, [])) + variable == 1
+        for (classroom_index, _), variables in block_courses.items():
+            problem += pulp.lpSum(variables) <= in_use[classroom_index]
+        for variables in instructor_courses.values():
+            if len(variables) > 1:
+                problem += pulp.lpSum(variables) <= 1
+
+        # Neither a classroom nor an instructor can be used during two overlapping time slots
+        for first_slot, second_slot in zip(*np.nonzero(catalog.upper_slot_overlaps)):
+            for classroom_index in range(num_classrooms):
+                variables = block_courses.get((classroom_index, first_slot), []) + \
+                    block_courses.get((classroom_index, second_slot), [])
+                if len(variables) > 1:
+                    problem += pulp.lpSum(variables) <= 1
+            for instructor_index in range(len(catalog.instructor_list)):
+                variables = instructor_courses.get((instructor_index, first_slot), []) + \
+                    instructor_courses.get((instructor_index, second_slot), [])
+                if len(variables) > 1:
+                    problem += pulp.lpSum(variables) <= 1
+        return problem, placements, in_use, missing, pulp.lpSum(penalties)
+
+    def set_initial_values(self, genome, placements, in_use, missing):
+        """
+        Starts the model from an existing schedule.
+
+        :param genome: genome of the schedule to start from
+        :param placements: dictionary of placement variables from build_model()
+        :param in_use: dictionary of in-use variables from build_model()
+        :param missing: dictionary of missing-course variables from build_model()
+        """
+        for (course_index, classroom_index, time_slot_index), variable in placements.items():
+            variable.setInitialValue(int(genome[classroom_index, time_slot_index] == course_index))
+        for classroom_index, variable in in_use.items():
+            variable.setInitialValue(int((genome[classroom_index] != -1).any()))
+        placed = np.zeros(len(missing), dtype=bool)
+        placed[genome[genome != -1]] = True
+        for course_index, variable in missing.items():
+            variable.setInitialValue(int(not placed[course_index]))
+
+    def run_model(self, problem, placements, in_use, missing, initial_genome, deadline):
+        """
+        Solves the model once, starting from an existing schedule if one is given.
+
+        :param problem: PuLP problem from build_model(), with its objective set
+        :param placements: dictionary of placement variables from build_model()
+        :param in_use: dictionary of in-use variables from build_model()
+        :param missing: dictionary of missing-course variables from build_model()
+        :param initial_genome: genome of the schedule to start from, or None
+        :param deadline: time by which the solver must stop, from time.perf_counter(), or None for no limit
+        :return: status of the solve and the schedule found, or None if the solver didn't find one
+        """
+        if initial_genome is not None:
+            self.set_initial_values(initial_genome, placements, in_use, missing)
+        time_limit = None if deadline is None else max(deadline - time.perf_counter(), 1)
+        solver = pulp.PULP_CBC_CMD(msg=self.msg, timeLimit=time_limit, threads=self.threads,
+                                   warmStart=initial_genome is not None)
+        problem.solve(solver)
+        status = self.STATUSES.get(problem.sol_status, "unknown")
+        if status not in ("optimal", "feasible"):
+            return status, None
+
+        schedule = Schedule(self.catalog)
+        for (course_index, classroom_index, time_slot_index), variable in placements.items():
+            if variable.varValue is not None and variable.varValue > 0.5:
+                schedule.genome[classroom_index, time_slot_index] = course_index
+        schedule.fitness = schedule.ensure_tally().fitness()
+        return status, schedule
+
+    def minimize_penalties(self, problem, placements, in_use, missing, penalty, schedule, status, deadline):
+        """
+        Trades classrooms for the penalties of the weighted constraints. The model is solved for the fewest missing
+        courses plus penalties with no limit on the classrooms in use, then again for each smaller number of classrooms
+        whose 1/n could still make up for the extra missing courses and penalties it needs.
+
+        :param problem: PuLP problem from build_model()
+        :param placements: dictionary of placement variables from build_model()
+        :param in_use: dictionary of in-use variables from build_model()
+        :param missing: dictionary of missing-course variables from build_model()
+        :param penalty: total penalty of the weighted constraints from build_model()
+        :param schedule: schedule with the fewest missing courses and then the fewest classrooms
+        :param status: status of the solve that found the schedule
+        :param deadline: time by which the solver must stop, from time.perf_counter(), or None for no limit
+        :return: status of the search, the most fit schedule found, and the number of times the model was solved
+        """
+        num_courses = len(self.catalog.course_list)
+        num_time_slots = self.catalog.time_grid.num_time_slots
+        fewest_missing = num_courses - len(np.unique(schedule.genome[schedule.genome != -1]))
+        fewest_classrooms = np.count_nonzero((schedule.genome != -1).any(axis=1))
+        problem.setObjective(pulp.lpSum(missing.values()) + penalty)
+
+        best = schedule
+        search_status, unlimited = self.run_model(problem, placements, in_use, missing, schedule.genome, deadline)
+        num_solves = 2
+        if unlimited is None:
+            return "feasible", best, num_solves
+        if status != "optimal":
+            search_status = "feasible"
+        if unlimited.fitness > best.fitness:
+            best = unlimited
+        lowest_cost = pulp.value(problem.objective)
+        classroom_limit = pulp.LpVariable("classroom_limit", 0, len(in_use), cat="Integer")
+        problem += pulp.lpSum(in_use.values()) <= classroom_limit
+
+        # Fewer classrooms than the first schedule means at least one more missing course, and every classroom holds
+        # at most one course per time slot
+        for num_classrooms in range(1, np.count_nonzero((unlimited.genome != -1).any(axis=1))):
+            lowest_cost_needed = max(lowest_cost, num_courses - num_classrooms * num_time_slots)
+            if num_classrooms < fewest_classrooms and status == "optimal":
+                lowest_cost_needed = max(lowest_cost_needed, fewest_missing + 1)
+            if 1 / num_classrooms - lowest_cost_needed <= best.fitness + 1e-9:
+                continue
+            if deadline is not None and time.perf_counter() >= deadline:
+                search_status = "feasible"
+                break
+            classroom_limit.upBound = num_classrooms
+            limited_status, limited = self.run_model(problem, placements, in_use, missing, best.genome, deadline)
+            num_solves += 1
+            if limited_status != "optimal":
+                search_status = "feasible"
+            if limited is not None and limited.fitness > best.fitness:
+                best = limited
+        return search_status, best, num_solves
+
+    def solve(self, time_limit=None):
+        """
+        Builds and solves the integer programming model, stopping at the time limit if one is given. When the catalog
+        has weighted constraints, the model is solved again to trade classrooms for penalties.
+
+        :param time_limit: number of seconds the solver may run for, or None to run until the model is solved
+        :return: SolverResult holding the best schedule found, or no schedule if the solver didn't find one
+        """
+        start = time.perf_counter()
+        deadline = None if time_limit is None else start + time_limit
+        problem, placements, in_use, missing, penalty = self.build_model()
+        initial_genome = GreedySolver(self.catalog).solve().schedule.genome if self.warm_start else None
+        build_seconds = time.perf_counter() - start
+
+        status, schedule = self.run_model(problem, placements, in_use, missing, initial_genome, deadline)
+        num_solves = 1
+        if schedule is not None and self.catalog.has_placement_penalties:
+            status, schedule, num_solves = self.minimize_penalties(problem, placements, in_use, missing, penalty,
+                                                                   schedule, status, deadline)
+        details = {"build_seconds": build_seconds, "num_variables": len(problem.variables()),
+                   "num_constraints": len(problem.constraints), "num_solves": num_solves}
+        if schedule is None:
+            return SolverResult(self.NAME, None, None, time.perf_counter() - start, status, details)
+        return SolverResult(self.NAME, schedule, schedule.fitness, time.perf_counter() - start, status, details)
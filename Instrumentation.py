@@ -0,0 +1,95 @@
+import csv
+import json
+
+"""
+Recorders for the events emitted by the genetic algorithm while it is running. An optimizer given a recorder emits one
+event when the initial population is formed, one event per generation, and one event when the run stops. Each event is
+a flat dictionary with an "event" key naming its type:
+  - population: time taken to form the population and the number of courses create_genome couldn't place
+  - generation: time spent on selection, crossover, mutation, fitness scoring, survivor selection, local search, and
+    exporting the most fit schedules, along with the best and average fitness score, the fraction of distinct genomes
+    in the population, the fitness cache hit rate for the generation, and the fitness cache's entries, hits, misses,
+    evictions, and size so far
+  - stop: the number of generations run and the reason the run stopped
+When no recorder is given, none of these timings or statistics are gathered.
+
+Any object with a record(event) method can be used as a recorder. The recorders below keep events in memory, pass them
+to a callback, or write them to a JSON Lines or CSV file.
+
+Author: Ryan Johnson
+"""
+
+EVENT_FIELDS = ["event", "generation", "seconds", "selection_seconds", "crossover_seconds", "mutation_seconds",
+                "offspring_seconds", "fitness_seconds", "survivor_selection_seconds", "local_search_seconds",
+                "export_seconds", "best_fitness", "average_fitness", "diversity", "fitness_requests",
+                "fitness_cache_hit_rate", "fitness_cache_entries", "fitness_cache_hits", "fitness_cache_misses",
+                "fitness_cache_evictions", "fitness_cache_lookup_hit_rate", "fitness_cache_bytes", "population_size",
+                "unplaced_courses", "reason"]
+
+
+class MemoryRecorder:
+    def __init__(self):
+        self.events = []
+
+    def record(self, event):
+        """
+        Stores a single event.
+
+        :param event: dictionary describing the event
+        """
+        self.events.append(event)
+
+    def close(self):
+        pass
+
+
+class CallbackRecorder:
+    def __init__(self, callback):
+        self.callback = callback
+
+    def record(self, event):
+        """
+        Passes a single event to the callback.
+
+        :param event: dictionary describing the event
+        """
+        self.callback(event)
+
+    def close(self):
+        pass
+
+
+class JsonLinesRecorder:
+    def __init__(self, path):
+        self.file = open(path, "w")
+
+    def record(self, event):
+        """
+        Writes a single event to the file as one line of JSON.
+
+        :param event: dictionary describing the event
+        """
+        self.file.write(json.dumps(event) + "\n")
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class CsvRecorder:
+    def __init__(self, path):
+        self.file = open(path, "w", newline="")
+        self.writer = csv.DictWriter(self.file, fieldnames=EVENT_FIELDS, extrasaction="ignore")
+        self.writer.writeheader()
+
+    def record(self, event):
+        """
+        Writes a single event to the file as one row, leaving the columns the event doesn't have empty.
+
+        :param event: dictionary describing the event
+        """
+        self.writer.writerow(event)
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
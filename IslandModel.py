@@ -0,0 +1,197 @@
+import random
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+from Schedule import Schedule
+
+"""
+Class for running the genetic algorithm as an island model. Several independent populations (islands) are evolved at
+the same time, each in its own process with its own tournament selection, crossover, and mutation. Every few
+generations, the islands stop and trade their most fit schedules with their neighbours before continuing. Two
+migration topologies are supported:
+  - ring: each island sends its migrants to the next island, with the last island sending to the first
+  - fully_connected: each island sends its migrants to every other island
+Incoming migrants replace the least fit schedules of the island receiving them. Since the islands only synchronize when
+migrating, they can be spread across processes with very little overhead, while keeping the populations apart between
+migrations slows down the loss of diversity that causes the population to converge early.
+
+The algorithm stops once the best fitness score across all islands has stayed the same for CONVERGENCE_NUM
+migrations. Statistics are kept for each island so that the number of islands and the migration rate can be tuned.
+
+Author: Ryan Johnson
+"""
+
+TOPOLOGIES = ("ring", "fully_connected")
+# Settings of the optimizer copied to the optimizer of every worker process. Schedules aren't exported from the islands,
+# since every island would overwrite the same files.
+ISLAND_SETTINGS = ("CROSSOVER_RATE", "MUTATION_RATE", "ELITE_COUNT", "TIE_BREAK", "REMOVE_DUPLICATES",
+                   "WARM_START_FRACTION", "WARM_START_PERTURBATION", "LOCAL_SEARCH_COUNT")
+
+# Optimizer used by a worker process to evolve islands, set up once when the worker is started
+_island_optimizer = None
+
+
+def _initialize_island_worker(catalog, population_size, settings):
+    """
+    Sets up the optimizer used by a single worker process to evolve islands.
+
+    :param catalog: catalog shared by every schedule
+    :param population_size: number of schedules on each island
+    :param settings: dictionary mapping each of the ISLAND_SETTINGS to its value in the main optimizer
+    """
+    global _island_optimizer
+    from Optimizer import Optimizer
+
+    _island_optimizer = Optimizer(catalog=catalog, population_size=0)
+    _island_optimizer.POPULATION_SIZE = population_size
+    for name, value in settings.items():
+        setattr(_island_optimizer, name, value)
+
+
+def _evolve_island(genomes, fitness_scores, random_state, num_generations):
+    """
+    Evolves a single island for the specified number of generations within a worker process. If no genomes are given, a
+    new random population is created for the island first.
+
+    :param genomes: genomes of the island's population, or None to create a new population
+    :param fitness_scores: fitness score of each genome in the island's population
+    :param random_state: state of the island's random number generator
+    :param num_generations: number of generations to evolve the island for
+    :return: genomes and fitness scores of the island's population, the island's new random state, and the average
+             and best fitness score of each generation
+    """
+    optimizer = _island_optimizer
+    random.setstate(random_state)
+    if genomes is None:
+        optimizer.population = optimizer.form_population(optimizer.POPULATION_SIZE)
+    else:
+        optimizer.population = [Schedule.from_genome(optimizer.catalog, genome, fitness)
+                                for genome, fitness in zip(genomes, fitness_scores)]
+
+    average_scores = []
+    best_scores = []
+    for _ in range(num_generations):
+        optimizer.form_next_generation()
+        average_scores.append(optimizer.average_fitness)
+        best_scores.append(optimizer.calculate_fitness(optimizer.population[0]))
+    optimizer.score_population(optimizer.population)
+
+    genomes = np.stack([schedule.genome for schedule in optimizer.population]).astype(np.int32)
+    fitness_scores = np.array([schedule.fitness for schedule in optimizer.population])
+    return genomes, fitness_scores, random.getstate(), average_scores, best_scores
+
+
+class IslandModel:
+    def __init__(self, optimizer, num_islands=4, migration_interval=5, num_migrants=2, topology="ring", island_size=None,
+                 workers=None, max_migrations=None):
+        if topology not in TOPOLOGIES:
+            raise ValueError(f"Unknown migration topology '{topology}', expected one of {TOPOLOGIES}")
+        self.optimizer = optimizer
+        self.num_islands = num_islands
+        self.migration_interval = migration_interval
+        self.num_migrants = num_migrants
+        self.topology = topology
+        # Unless specified, the optimizer's population is divided evenly between the islands
+        self.island_size = max(optimizer.POPULATION_SIZE // num_islands, 3) if island_size is None else island_size
+        self.workers = num_islands if workers is None else workers
+        self.max_migrations = max_migrations
+
+        self.island_genomes = [None] * num_islands
+        self.island_fitness = [None] * num_islands
+        # Each island has its own random number generator, seeded from the main process
+        self.island_random_states = [random.Random(random.getrandbits(64)).getstate() for _ in range(num_islands)]
+        self.island_stats = [{"island": island, "generations": 0, "average_fitness": [], "best_fitness": [],
+                              "immigrants_accepted": 0} for island in range(num_islands)]
+
+    def migration_targets(self, island):
+        """
+        Finds the islands that receive migrants from a single island, based on the migration topology.
+
+        :param island: index of the island sending migrants
+        :return: list of indices of the islands receiving migrants
+        """
+        if self.num_islands < 2:
+            return []
+        if self.topology == "ring":
+            return [(island + 1) % self.num_islands]
+        return [target for target in range(self.num_islands) if target != island]
+
+    def migrate(self):
+        """
+        Sends copies of the most fit schedules from each island to its neighbours, replacing the least fit schedules of
+        the receiving island.
+        """
+        # Choose every island's migrants before any island is changed
+        migrants = []
+        for genomes, fitness_scores in zip(self.island_genomes, self.island_fitness):
+            best = np.argsort(fitness_scores, kind="stable")[::-1][:self.num_migrants]
+            migrants.append((genomes[best].copy(), fitness_scores[best].copy()))
+
+        incoming = [[] for _ in range(self.num_islands)]
+        for island in range(self.num_islands):
+            for target in self.migration_targets(island):
+                incoming[target].append(migrants[island])
+
+        for island, arrivals in enumerate(incoming):
+            if not arrivals:
+                continue
+            genomes = self.island_genomes[island]
+            fitness_scores = self.island_fitness[island]
+            arriving_genomes = np.concatenate([arrival[0] for arrival in arrivals])[:len(genomes)]
+            arriving_fitness = np.concatenate([arrival[1] for arrival in arrivals])[:len(genomes)]
+
+            # The least fit schedules on the island are replaced by the migrants
+            worst = np.argsort(fitness_scores, kind="stable")[:len(arriving_genomes)]
+            genomes[worst] = arriving_genomes
+            fitness_scores[worst] = arriving_fitness
+            self.island_stats[island]["immigrants_accepted"] += len(arriving_genomes)
+
+    def best_schedule(self):
+        """
+        Finds the most fit schedule across all islands.
+
+        :return: Schedule object with the highest fitness score of any island
+        """
+        best_island = max(range(self.num_islands), key=lambda island: self.island_fitness[island].max())
+        best_index = int(np.argmax(self.island_fitness[best_island]))
+        return Schedule.from_genome(self.optimizer.catalog, self.island_genomes[best_island][best_index],
+                                    self.island_fitness[best_island][best_index])
+
+    def run(self):
+        """
+        Evolves every island in parallel, migrating schedules between islands every migration_interval generations,
+        until the best fitness score across the islands has stayed the same for CONVERGENCE_NUM migrations.
+
+        :return: Schedule object with the highest fitness score found on any island
+        """
+        optimizer = self.optimizer
+        best_scores = []
+        num_migrations = 0
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_initialize_island_worker,
+                                 initargs=(optimizer.catalog, self.island_size,
+                                           {name: getattr(optimizer, name) for name in ISLAND_SETTINGS})) as executor:
+            while True:
+                futures = [executor.submit(_evolve_island, self.island_genomes[island], self.island_fitness[island],
+                                           self.island_random_states[island], self.migration_interval)
+                           for island in range(self.num_islands)]
+                for island, future in enumerate(futures):
+                    genomes, fitness_scores, random_state, average_scores, island_best_scores = future.result()
+                    self.island_genomes[island] = genomes
+                    self.island_fitness[island] = fitness_scores
+                    self.island_random_states[island] = random_state
+                    stats = self.island_stats[island]
+                    stats["generations"] += len(average_scores)
+                    stats["average_fitness"].extend(average_scores)
+                    stats["best_fitness"].extend(island_best_scores)
+
+                best_scores.append(max(fitness_scores.max() for fitness_scores in self.island_fitness))
+                print(f"Migration {num_migrations + 1}  -  Best Fitness Score: {best_scores[-1]}")
+
+                last_scores = best_scores[-optimizer.CONVERGENCE_NUM:]
+                converged = len(best_scores) >= optimizer.CONVERGENCE_NUM and len(set(last_scores)) == 1
+                num_migrations += 1
+                if converged or (self.max_migrations is not None and num_migrations >= self.max_migrations):
+                    break
+                self.migrate()
+
+        return self.best_schedule()
@@ -0,0 +1,159 @@
+import random
+import numpy as np
+
+"""
+Class for improving a single schedule with a greedy local search, turning the genetic algorithm into a memetic
+algorithm when applied to the most fit schedules of each generation. The search repairs a schedule in four steps:
+  - Courses placed more than once keep a single placement, which also removes any course held on both MWF and Tth
+  - Courses missing from the schedule are placed
+  - Instructors teaching more than one course during a time block have the extra courses moved to another time block
+  - The least used classrooms are emptied by moving their courses into classrooms already in use
+Courses are always placed in the smallest classroom that fits them and has a time block free for their instructor,
+preferring classrooms already in use. Every change is scored with the schedule's penalty tally, so each step only costs
+the work of the moves it makes, and classrooms are only emptied when every one of their courses can be moved.
+
+Author: Ryan Johnson
+"""
+
+
+class LocalSearch:
+    def __init__(self, catalog, max_packed_classrooms=3):
+        self.catalog = catalog
+        self.max_packed_classrooms = max_packed_classrooms
+
+    def repair(self, schedule):
+        """
+        Runs every step of the local search on a schedule, changing it in place.
+
+        :param schedule: Schedule object to be improved
+        :return: fitness score of the improved schedule
+        """
+        # Each step keeps a reference to the tally, so a genome and tally shared with a copy are made writable first
+        schedule.make_writable()
+        tally = schedule.ensure_tally()
+        if schedule.fitness is None:
+            schedule.fitness = tally.fitness()
+        self.remove_duplicate_courses(schedule)
+        self.place_missing_courses(schedule)
+        self.resolve_instructor_conflicts(schedule)
+        self.pack_classrooms(schedule)
+        return schedule.fitness
+
+    def find_placement(self, schedule, course_index, excluded_classroom=None, in_use_only=False, first_free=False):
+        """
+        Finds the smallest classroom with enough seats for a course and an empty time block during which the course's
+        instructor isn't teaching, preferring classrooms that are already in use. The time block is chosen at random
+        unless first_free is set, in which case the earliest one is chosen.
+
+        :param schedule: Schedule object the course is being placed in
+        :param course_index: index of the course being placed
+        :param excluded_classroom: index of a classroom that can't be chosen, or None
+        :param in_use_only: whether only classrooms already holding courses can be chosen
+        :param first_free: whether to choose the earliest free time block rather than a random one
+        :return: classroom index and time slot index of the placement, or None if no placement was found
+        """
+        tally = schedule.tally
+        classrooms = self.catalog.feasible_classrooms(course_index)
+        free = schedule.genome[classrooms] == -1
+        instructor_index = self.catalog.course_instructors[course_index]
+        if instructor_index != -1:
+            free &= tally.instructor_occupancy[instructor_index] == 0
+        # Time blocks overlapping a time block already used by the classroom or instructor aren't free either
+        if self.catalog.has_overlaps:
+            overlaps = self.catalog.slot_overlaps.astype(np.int32)
+            free &= (~free).astype(np.int32) @ overlaps == 0
+            if instructor_index != -1:
+                free &= tally.instructor_occupancy[instructor_index] @ overlaps == 0
+        if excluded_classroom is not None:
+            free[classrooms == excluded_classroom] = False
+
+        candidates = np.flatnonzero(free.any(axis=1))
+        in_use = candidates[tally.classroom_counts[classrooms[candidates]] > 0]
+        if len(in_use):
+            row = in_use[0]
+        elif len(candidates) and not in_use_only:
+            row = candidates[0]
+        else:
+            return None
+        time_slots = np.flatnonzero(free[row])
+        return classrooms[row], time_slots[0] if first_free else random.choice(time_slots)
+
+    def remove_duplicate_courses(self, schedule):
+        """
+        Removes every placement but one of each course placed more than once, keeping a placement where the course's
+        instructor isn't teaching anything else if there is one.
+
+        :param schedule: Schedule object to be improved
+        """
+        tally = schedule.tally
+        for course_index in np.flatnonzero(tally.course_counts > 1):
+            placements = np.argwhere(schedule.genome == course_index)
+            instructor_index = self.catalog.course_instructors[course_index]
+            if instructor_index != -1:
+                clashes = tally.instructor_occupancy[instructor_index, placements[:, 1]] > 1
+                placements = placements[np.argsort(clashes, kind="stable")]
+            for classroom_index, time_slot_index in placements[1:]:
+                schedule.remove_course(classroom_index, time_slot_index)
+
+    def place_missing_courses(self, schedule):
+        """
+        Places every course missing from the schedule, where a placement can be found.
+
+        :param schedule: Schedule object to be improved
+        """
+        for course_index in np.flatnonzero(schedule.tally.course_counts == 0):
+            placement = self.find_placement(schedule, course_index)
+            if placement is not None:
+                schedule.place_course(*placement, course_index)
+
+    def resolve_instructor_conflicts(self, schedule):
+        """
+        Moves courses away from time blocks where their instructor is teaching more than one course, keeping a move only
+        if it improves the fitness score.
+
+        :param schedule: Schedule object to be improved
+        """
+        tally = schedule.tally
+        course_instructors = self.catalog.course_instructors
+        for instructor_index, time_slot_index in np.argwhere(tally.instructor_occupancy > 1):
+            column = schedule.genome[:, time_slot_index]
+            clashing = np.flatnonzero((column != -1) & (course_instructors[np.maximum(column, 0)] == instructor_index))
+            # Every course but the first is moved to another time block
+            for classroom_index in clashing[1:]:
+                course_index = schedule.genome[classroom_index, time_slot_index]
+                placement = self.find_placement(schedule, course_index)
+                if placement is None:
+                    continue
+                fitness = schedule.fitness
+                schedule.move_course(classroom_index, time_slot_index, *placement)
+                if schedule.fitness < fitness:
+                    schedule.move_course(*placement, classroom_index, time_slot_index)
+
+    def pack_classrooms(self, schedule):
+        """
+        Tries to empty the least used classrooms by moving each of their courses into another classroom already in use.
+        A classroom is only emptied if all of its courses can be moved without lowering the fitness score; otherwise,
+        every move is undone.
+
+        :param schedule: Schedule object to be improved
+        """
+        tally = schedule.tally
+        in_use = np.flatnonzero(tally.classroom_counts > 0)
+        least_used = in_use[np.argsort(tally.classroom_counts[in_use], kind="stable")][:self.max_packed_classrooms]
+        for classroom_index in least_used:
+            if tally.num_classrooms_used <= 1:
+                return
+            fitness = schedule.fitness
+            moves = []
+            for time_slot_index in np.flatnonzero(schedule.genome[classroom_index] != -1):
+                course_index = schedule.genome[classroom_index, time_slot_index]
+                placement = self.find_placement(schedule, course_index, excluded_classroom=classroom_index,
+                                                in_use_only=True)
+                if placement is None:
+                    break
+                schedule.move_course(classroom_index, time_slot_index, *placement)
+                moves.append((classroom_index, time_slot_index, *placement))
+
+            if tally.classroom_counts[classroom_index] > 0 or schedule.fitness < fitness:
+                for from_classroom, from_time_slot, to_classroom, to_time_slot in reversed(moves):
+                    schedule.move_course(to_classroom, to_time_slot, from_classroom, from_time_slot)
@@ -1,10 +1,20 @@
+import argparse
 import random
-import pandas as pd
-
-from Classroom import Classroom
-from Course import Course
-from Instructor import Instructor
+import threading
+import time
+import numpy as np
+
+from Catalog import Catalog
+from Checkpoint import Checkpoint
+from DataLoader import DataLoader
+from FitnessCache import FitnessCache
+from IslandModel import IslandModel
+from LocalSearch import LocalSearch
+from ParallelEngine import ParallelEngine
 from Schedule import Schedule
+from ScheduleExporter import ScheduleExporter
+from Solver import Solver, SolverResult
+from TerminationPolicy import TerminationPolicy
 
 """
 Contains a genetic algorithm for creating an optimal course schedule for Carroll College. Course, classroom, and
@@ -14,25 +24,97 @@ toward creating a schedule with the following goals:
   - All courses must be included in the final schedule
   - Courses may be assigned as either a MWF or Tth course, but not both
   - Ideal schedules will use less classrooms
+The time blocks courses can be placed in, along with any extra weighted constraints such as instructor unavailability,
+are read from config/scheduling.json and compiled into the catalog's penalty matrices.
 
 As the algorithm is running, the average fitness score is displayed. Once the fitness scores have converged to the same
-score for five generations, the algorithm will end and display the final course schedule.
+score for five generations, the algorithm will end and display the final course schedule. Other stopping rules, such
+as a time limit or a target fitness score, can be given with a TerminationPolicy. The best schedule found so far is
+kept throughout the run and can be read from another thread with get_best(). Setting LOCAL_SEARCH_COUNT repairs that
+many of the most fit schedules of each generation with a greedy local search. Fitness scores are cached by a hash of
+each genome, so a schedule identical to one already scored is never evaluated again.
+
+The offspring of each generation can be created across several processes by passing the number of worker processes to
+the optimizer. Passing a seed makes runs reproducible. Alternatively, run_island_optimization() evolves several separate
+populations in parallel, trading their most fit schedules every few generations.
+
+Passing a recorder from the Instrumentation module gives a stream of events describing where the time of each
+generation is spent and why the run stopped.
+
+Long runs can be checkpointed to disk every few generations and resumed from the latest checkpoint. Part of the initial
+population can also be started from the room assignments currently found in the course spreadsheet, rather than from
+random genomes.
+
+The final schedule can be exported as CSV, JSON, or XLSX in the same columns as the course spreadsheet, and setting
+EXPORT_TOP_K exports that many of the most fit schedules every generation for live monitoring.
+
+The optimizer implements the Solver interface, so solve() runs the algorithm quietly and returns a SolverResult that can
+be compared with those of the greedy and integer programming solvers.
 
 Author: Ryan Johnson
 """
 
 
-class Optimizer:
-    def __init__(self):
-        self.CONVERGENCE_NUM = 3
-        self.POPULATION_SIZE = 500
-        self.CROSSOVER_RATE = 0.001
-        self.MUTATION_RATE = 0.9
-
-        self.classroom_list, self.course_list, self.instructor_list = self.upload_data()
+class Optimizer(Solver):
+    NAME = "genetic"
+
+    def __init__(self, workers=1, seed=None, catalog=None, population_size=500, recorder=None, warm_start=0.0,
+                 fitness_cache_bytes=64 * 1024 * 1024, crossover_rate=0.001, mutation_rate=0.9, convergence_num=3):
+        self.CONVERGENCE_NUM = convergence_num
+        self.POPULATION_SIZE = population_size
+        self.CROSSOVER_RATE = crossover_rate
+        self.MUTATION_RATE = mutation_rate
+        self.WORKERS = workers
+        # Survivor selection: None keeps every parent competing with the offspring, while a number keeps only that
+        # many of the best parents. Ties are broken in favour of "parents", "offspring", or at "random".
+        self.ELITE_COUNT = None
+        self.TIE_BREAK = "parents"
+        self.REMOVE_DUPLICATES = True
+        # Fraction of the initial population started from the current room assignments, and the fraction of courses
+        # placed randomly in each of these schedules (other than the first) to keep them from being identical
+        self.WARM_START_FRACTION = warm_start
+        self.WARM_START_PERTURBATION = 0.1
+        # Number of the most fit schedules improved by local search each generation, with 0 turning it off
+        self.LOCAL_SEARCH_COUNT = 0
+        # Number of the most fit schedules exported to EXPORT_DIRECTORY each generation, with 0 turning it off
+        self.EXPORT_TOP_K = 0
+        self.EXPORT_DIRECTORY = "exports"
+        self.EXPORT_FORMAT = "csv"
+
+        if seed is not None:
+            random.seed(seed)
+
+        # Data is only loaded from the spreadsheets if an existing catalog isn't provided
+        if catalog is None:
+            classroom_list, course_list, instructor_list = self.upload_data()
+            time_grid, constraints = DataLoader().load_config()
+            catalog = Catalog(course_list, classroom_list, instructor_list, time_grid, constraints)
+        self.catalog = catalog
+        self.classroom_list, self.course_list, self.instructor_list = (catalog.classroom_list, catalog.course_list,
+                                                                        catalog.instructor_list)
+        self.parallel_engine = ParallelEngine(self, workers) if workers > 1 else None
+        self.local_search = LocalSearch(catalog)
+        self.exporter = ScheduleExporter(catalog)
+        # Fitness scores of previously evaluated genomes, with a cap of 0 bytes turning the cache off
+        self.fitness_cache = FitnessCache(fitness_cache_bytes)
+
+        # Instrumentation, only gathered when a recorder is given
+        self.recorder = recorder
+        self.phase_times = None
+        self.generation_num = 0
+        self.fitness_requests = 0
+        self.fitness_cache_hits = 0
+        self.num_unplaced_courses = 0
 
         self.population = self.form_population(self.POPULATION_SIZE)
+        self.population_fitness = np.array([])
+        self.fitness_history = []
         self.average_fitness = 0
+
+        # Best schedule found so far, guarded by a lock so it can be read while the algorithm is running
+        self.best_lock = threading.Lock()
+        self.best_fitness = None
+        self.best_schedule = None
         self.total_fitness = 0
 
     def upload_data(self):
@@ -41,55 +123,60 @@ class Optimizer:
         these spreadsheets is combined to create the classroom, course, and instructor objects for scheduling. Each of
         these different types of object are returned as a separate list. Note that only classrooms with a known number
         of seats are used. Similarly, only courses currently located in rooms with a known number of seats are used.
+        The filtered data is cached, so the spreadsheets are only parsed again once one of them has changed.
 
         :return: list containing three sublists - classrooms, courses, and instructors
         """
-        classroom_data = pd.read_excel("excel/classroom_info.xlsx", engine="openpyxl")
-        course_data = pd.read_excel("excel/schedule.xlsx", engine="openpyxl").dropna(subset=['CSM_BLDG', 'CSM_ROOM'])
-
-        # Create classroom object for each room with known number of seats
-        classrooms_dict = {}
-        for index, row in classroom_data.iterrows():
-            room_name = row['Building Name'] + '-' + str(row['Room Number'])
-            classroom = Classroom(room_name, row['Number of Student Seats in Room'])
-            classrooms_dict[room_name] = classroom
-        classrooms_list = list(classrooms_dict.values())
-
-        # Create course object for each course currently located in one of the classrooms of known size
-        courses_list = []
-        instructors_dict = {}
-        for index, row in course_data.iterrows():
-            # Only use lecture courses in classrooms of known size
-            room_name = row['CSM_BLDG'] + '-' + str(row['CSM_ROOM'])
-            if row['CSM_INSTR_METHOD'] != "LEC" or room_name not in classrooms_dict.keys():
-                continue
-            instructor = Instructor(row['SEC_FACULTY_INFO'])
-            course = Course(row['SEC_SHORT_TITLE'], row['SEC_CAPACITY'], instructor)
-            courses_list.append(course)
-
-            # Create a new instructor if not already in the dictionary
-            if instructor.name not in instructors_dict.keys():
-                instructors_dict[instructor.name] = instructor
-        instructors_list = list(instructors_dict.values())
-        return classrooms_list, courses_list, instructors_list
+        return DataLoader().load()
 
     def form_population(self, pop_size: int):
         """
-        Creates the specified number of schedule objects and places them together in a single list.
+        Creates the specified number of schedule objects and places them together in a single list. The first
+        WARM_START_FRACTION of the schedules are started from the current room assignments, while the rest are random.
 
         :param pop_size: Integer specifying how many individual schedules should be created
         :return: List of schedule objects
         """
+        start = time.perf_counter()
         population = []
+        self.num_unplaced_courses = 0
+        num_warm_starts = round(pop_size * self.WARM_START_FRACTION)
         for i in range(pop_size):
-            schedule = Schedule(self.course_list, self.classroom_list, self.instructor_list)
-            schedule.create_genome()
+            schedule = Schedule(self.catalog)
+            if i < num_warm_starts:
+                perturbation = 0.0 if i == 0 else self.WARM_START_PERTURBATION
+                self.num_unplaced_courses += schedule.create_current_genome(perturbation)
+            else:
+                self.num_unplaced_courses += schedule.create_genome()
             population.append(schedule)
+
+        if self.recorder is not None and pop_size:
+            self.recorder.record({"event": "population", "seconds": time.perf_counter() - start,
+                                  "population_size": pop_size, "unplaced_courses": self.num_unplaced_courses})
         return population
 
     def calculate_fitness(self, schedule: Schedule):
         """
-        Calculates the "goodness" of a given schedule. A valid schedule will have a positive fitness score,
+        Calculates the "goodness" of a given schedule, using the same scoring as evaluate_population().
+
+        @param schedule: Schedule object to be evaluated
+        @return: Fitness score for the Schedule object, with larger scores indicating better schedules
+        """
+        # Don't recalculate the fitness if it's already been calculated
+        if schedule.fitness is not None:
+            return schedule.fitness
+
+        key = self.fitness_cache.key(schedule.genome)
+        fitness = self.fitness_cache.get(key)
+        if fitness is None:
+            fitness = self.evaluate_population(schedule.genome[np.newaxis])[0]
+            self.fitness_cache.put(key, fitness)
+        schedule.fitness = fitness
+        return fitness
+
+    def evaluate_population(self, genomes):
+        """
+        Calculates the "goodness" of many schedule genomes at once. A valid schedule will have a positive fitness score,
         while a larger positive fitness score indicates that less classrooms are being used. Schedules are penalized
         for the following:
           - Using more classrooms
@@ -97,65 +184,103 @@ class Optimizer:
             time block
           - Not containing all courses
           - Assigning a course to both a MWF and Tth time slot
+          - Using a classroom or instructor during two overlapping time slots
+          - Breaking any of the catalog's weighted constraints
 
-        @param schedule: Schedule object to be evaluated
-        @return: Fitness score for the Schedule object, with larger scores indicating better schedules
+        Rather than looping over each schedule, every penalty is counted for the whole batch of genomes with NumPy
+        reductions over the occupied time blocks.
+
+        @param genomes: array of schedule genomes, with shape (schedules, classrooms, time slots)
+        @return: array containing the fitness score of each genome, with larger scores indicating better schedules
         """
-        # Don't recalculate the fitness if it's already been calculated
-        if schedule.fitness != 0:
-            return schedule.fitness
+        genomes = np.asarray(genomes)
+        num_genomes, num_classrooms, num_time_slots = genomes.shape
+        num_courses = len(self.course_list)
+        num_instructors = len(self.instructor_list)
+
+        occupied = genomes != -1
+        genome_ids, classroom_ids, time_slot_ids = np.nonzero(occupied)
+        course_ids = genomes[occupied]
 
         # Penalizes for using more classrooms
-        num_classrooms_used = 0
-        for classroom in schedule.schedule:
-            for time_block in classroom.schedule:
-                if time_block != -1:
-                    num_classrooms_used += 1
-                    break
+        num_classrooms_used = np.count_nonzero(occupied.any(axis=2), axis=1)
         fitness = 1 / num_classrooms_used
 
-        # Penalizes for assigning an instructor to a time block more than once
-        for instructor in schedule.instructor_list:
-            course_list = instructor.courses
-            # Find the number of courses taught by an instructor during a single time block. Ideal solutions should
-            # have a value of 1.
-            for i in range(schedule.MONDAY_TIME_SLOTS + schedule.TUESDAY_TIME_SLOTS):
-                num_courses_taught = 0
-                for classroom in schedule.schedule:
-                    if classroom.schedule[i] in course_list:
-                        num_courses_taught += 1
-                # Subtract a fitness point for every time an instructor is assigned more than once to a time block
-                if num_courses_taught > 1:
-                    fitness -= 1
+        # Penalizes for assigning an instructor to a time block more than once. The number of courses taught by each
+        # instructor during each time block is counted, with ideal solutions having a value of 1.
+        instructor_ids = self.catalog.course_instructors[course_ids]
+        taught = instructor_ids != -1
+        occupancy_ids = (genome_ids[taught] * num_time_slots + time_slot_ids[taught]) * num_instructors + \
+            instructor_ids[taught]
+        num_courses_taught = np.bincount(occupancy_ids, minlength=num_genomes * num_time_slots * num_instructors)
+        fitness -= np.count_nonzero(num_courses_taught.reshape(num_genomes, -1) > 1, axis=1)
 
         # Penalizes for not including all courses in the final schedule
-        for course in self.course_list:
-            course_found = False
-            for classroom in schedule.schedule:
-                if course in classroom.schedule:
-                    course_found = True
-                    break
-            if course_found:
-                continue
-            fitness -= 1
-
-        # Penalizes for assigning a course to both MWF and Tth
-        for classroom in schedule.schedule:
-            for monday_time_block in classroom.schedule[:schedule.MONDAY_TIME_SLOTS]:
-                for tuesday_time_block in classroom.schedule[schedule.MONDAY_TIME_SLOTS:]:
-                    if (monday_time_block == tuesday_time_block) and (monday_time_block != -1):
-                        # print(monday_time_block, tuesday_time_block)
-                        fitness -= 1
-                        break
+        course_placed = np.zeros((num_genomes, num_courses), dtype=bool)
+        course_placed[genome_ids, course_ids] = True
+        fitness -= num_courses - np.count_nonzero(course_placed, axis=1)
+
+        # Penalizes for assigning a course to both MWF and Tth. Every MWF time block is penalized if the same course is
+        # also held on Tth in the same classroom. Each occupied time block is encoded as a single (genome, classroom,
+        # course) key, so only the occupied time blocks are compared rather than a table of every possible key.
+        monday = time_slot_ids < self.catalog.time_grid.pattern_sizes[0]
+        block_keys = (genome_ids.astype(np.int64) * num_classrooms + classroom_ids) * num_courses + course_ids
+        duplicated = np.isin(block_keys[monday], block_keys[~monday])
+        fitness -= np.bincount(genome_ids[monday][duplicated], minlength=num_genomes)
+
+        # Penalizes for using a classroom, or assigning an instructor, during two time slots that overlap. Each pair of
+        # overlapping time slots is counted once from the catalog's overlap matrix.
+        if self.catalog.has_overlaps:
+            upper_overlaps = self.catalog.upper_slot_overlaps
+            classroom_occupancy = occupied.astype(np.int64)
+            instructor_occupancy = num_courses_taught.reshape(num_genomes, num_time_slots, num_instructors)
+            fitness -= np.einsum("grs,st,grt->g", classroom_occupancy, upper_overlaps, classroom_occupancy)
+            fitness -= np.einsum("gsi,st,gti->g", instructor_occupancy, upper_overlaps, instructor_occupancy)
+
+        # Penalizes for breaking the catalog's weighted constraints, looked up from its penalty matrices
+        if self.catalog.has_placement_penalties:
+            placement_penalties = self.catalog.course_slot_penalties[course_ids, time_slot_ids] + \
+                self.catalog.course_classroom_penalties[course_ids, classroom_ids]
+            fitness -= np.bincount(genome_ids, weights=placement_penalties, minlength=num_genomes)
 
-        schedule.fitness = fitness
         return fitness
 
+    def score_population(self, schedules):
+        """
+        Calculates the fitness score of every schedule in a list that hasn't yet been scored, evaluating all of them in a
+        single batch. Schedules whose genome is in the fitness cache aren't evaluated again.
+
+        :param schedules: list of schedule objects to be scored
+        """
+        unscored = [schedule for schedule in schedules if schedule.fitness is None]
+        self.fitness_requests += len(schedules)
+
+        # Genomes seen before take their score from the cache, while identical new genomes are only evaluated once
+        pending = {}
+        for schedule in unscored:
+            key = self.fitness_cache.key(schedule.genome)
+            fitness = self.fitness_cache.get(key) if key not in pending else None
+            if fitness is None:
+                pending.setdefault(key, []).append(schedule)
+            else:
+                schedule.fitness = fitness
+        self.fitness_cache_hits += len(schedules) - len(pending)
+        if not pending:
+            return
+
+        fitness_scores = self.evaluate_population(np.stack([duplicates[0].genome for duplicates in pending.values()]))
+        for (key, duplicates), fitness in zip(pending.items(), fitness_scores):
+            self.fitness_cache.put(key, fitness)
+            for schedule in duplicates:
+                schedule.fitness = fitness
+
     def calculated_average_fitness(self):
         """
         Calculates the average fitness score across the population as a whole. Used for determining whether the algorithm
         has converged onto a single fitness score yet.
         """
+        self.score_population(self.population)
+
         total_fitness = 0
         fitness_levels = []
         # Add up all the fitness of each individual & store them in a list
@@ -164,6 +289,7 @@ class Optimizer:
             fitness_levels.append(ind_fitness)
             total_fitness += ind_fitness
         # Save the fitness of the population as a whole to be used for analysis purposes
+        self.population_fitness = np.array(fitness_levels, dtype=float)
         self.total_fitness = total_fitness
         self.average_fitness = total_fitness / len(self.population)
 
@@ -199,69 +325,68 @@ class Optimizer:
         of the other parent's genome.
 
         :param parents: list containing two parent schedules
-        :return: child genome, created by combining the genomes of the two parent schedules
+        :return: child schedule, created by combining the genomes of the two parent schedules
         """
-        # Crossover doesn't occur (1 - CROSSOVER_RATE)% of the time
+        # Crossover doesn't occur (1 - CROSSOVER_RATE)% of the time. The child is then a copy of the first parent,
+        # keeping its fitness score and penalty tally.
         if random.random() >= self.CROSSOVER_RATE:
-            return parents[0].schedule
+            return parents[0].copy()
 
         parent1 = parents[0]
         parent2 = parents[1]
 
-        crossover_point = random.randint(0, len(parent1.schedule) - 1)
-        child_genome = parent1.schedule[:crossover_point] + parent2.schedule[crossover_point:]
+        crossover_point = random.randint(0, len(parent1.genome) - 1)
+        child_genome = np.concatenate((parent1.genome[:crossover_point], parent2.genome[crossover_point:]))
 
-        return child_genome
+        return Schedule(self.catalog, child_genome)
 
     def mutate(self, schedule: Schedule):
         """
         Mutates two schedule genomes by moving a random course from a lesser used classroom to a greater used classroom,
-        moving toward fewer classrooms being used.
+        moving toward fewer classrooms being used. The fitness score is updated for the moved course only, using the
+        schedule's penalty tally.
 
         :param schedule: Schedule object to be mutated
         """
         if random.random() < self.MUTATION_RATE:
             return
 
-        # Find all classrooms hosting courses
-        used_classrooms = []
-        for classroom in schedule.schedule:
-            for time_block in classroom.schedule:
-                if time_block != -1:
-                    used_classrooms.append(classroom)
+        genome = schedule.genome
+        occupied = genome != -1
+        num_courses = occupied.sum(axis=1)
+
+        # Choose 2 used classrooms to mutate, with each classroom weighted by the number of courses it hosts
+        occupied_cells = np.flatnonzero(occupied)
 
         # Can't mutate if there aren't at least 2 classrooms that have courses
-        if len(used_classrooms) < 2:
+        if len(occupied_cells) < 2:
             return
 
-        # Choose 2 used classrooms to mutate
-        mutated_classrooms = random.sample(used_classrooms, 2)
+        mutated_classrooms = [occupied_cells[cell] // schedule.num_time_slots
+                              for cell in random.sample(range(len(occupied_cells)), 2)]
+        if mutated_classrooms[0] == mutated_classrooms[1]:
+            return
 
         # Determine which classrooms hosts more courses
-        greater_courses_num = 0
-        greater_courses_room = None
-        for classroom in mutated_classrooms:
-            num_courses = classroom.schedule.count(-1)
-            if num_courses > greater_courses_num:
-                greater_courses_num = num_courses
-                greater_courses_room = classroom
-        mutated_classrooms.remove(greater_courses_room)
-        lesser_courses_room = mutated_classrooms[0]
-
-        # Pick a random course to move to the other classroom
-        course_index, course = random.choice(
-            [(index, course) for index, course in enumerate(lesser_courses_room.schedule) if course != -1])
-        # Randomly choose courses until one is found that will fit in greater_used_room (or quit after 10 iterations)
-        for i in range(10):
-            if course.enrolled > greater_courses_room.size:
-                course_index, course = random.choice(
-                    [(index, course) for index, course in enumerate(lesser_courses_room.schedule) if course != -1])
+        if num_courses[mutated_classrooms[0]] >= num_courses[mutated_classrooms[1]]:
+            greater_courses_room, lesser_courses_room = mutated_classrooms
+        else:
+            lesser_courses_room, greater_courses_room = mutated_classrooms
+
+        # Pick a random course to move to the other classroom, choosing only from courses that fit in greater_used_room
+        course_slots = np.flatnonzero(occupied[lesser_courses_room])
+        fitting = self.catalog.course_fits(genome[lesser_courses_room, course_slots], greater_courses_room)
+        course_slots = course_slots[fitting]
+        if len(course_slots) == 0:
+            return
+        course_index = random.choice(course_slots)
 
         # Find an empty slot to move the course to
-        course_placement_index = random.choice(
-            [index for index, course in enumerate(greater_courses_room.schedule) if course == -1])
-        lesser_courses_room.schedule[course_index] = -1
-        greater_courses_room.schedule[course_placement_index] = course
+        empty_slots = np.flatnonzero(~occupied[greater_courses_room])
+        if len(empty_slots) == 0:
+            return
+        course_placement_index = random.choice(empty_slots)
+        schedule.move_course(lesser_courses_room, course_index, greater_courses_room, course_placement_index)
 
     def create_single_offspring(self):
         """
@@ -269,59 +394,362 @@ class Optimizer:
 
         :return: Schedule object, created from two parents, having been mutated already
         """
+        if self.phase_times is None:
+            parents = self.select_parents()
+            offspring = self.crossover(parents)
+            self.mutate(offspring)
+            return offspring
+
+        # Time each step when instrumentation is enabled
+        start = time.perf_counter()
         parents = self.select_parents()
-        offspring = Schedule(self.course_list, self.classroom_list, self.instructor_list)
-        offspring.schedule = self.crossover(parents)
+        selected = time.perf_counter()
+        offspring = self.crossover(parents)
+        crossed = time.perf_counter()
         self.mutate(offspring)
+        mutated = time.perf_counter()
+        self.phase_times["selection"] += selected - start
+        self.phase_times["crossover"] += crossed - selected
+        self.phase_times["mutation"] += mutated - crossed
+        return offspring
+
+    def create_offspring(self, num_offspring):
+        """
+        Creates the specified number of child schedules from the current population, scoring all of them together.
 
+        :param num_offspring: number of child schedules to be created
+        :return: list of scored offspring schedule objects
+        """
+        if self.parallel_engine is not None:
+            return self.parallel_engine.create_offspring(self.population, num_offspring)
+
+        offspring = [self.create_single_offspring() for _ in range(num_offspring)]
+        start = time.perf_counter()
+        self.score_population(offspring)
+        if self.phase_times is not None:
+            self.phase_times["fitness"] += time.perf_counter() - start
         return offspring
 
     def form_next_generation(self):
         """
         Creates a child population of schedules of the same size as the parent population. The child and parent schedule
-        lists are combined and sorted based on their fitness score. From this combined list, the schedules with the best
-        fitness scores are selected to be the next generation, selecting the same number of schedules as in the pevious
-        generation.
+        lists are combined, and the schedules with the best fitness scores are selected to be the next generation,
+        selecting the same number of schedules as in the pevious generation.
         """
+        self.generation_num += 1
+        recording = self.recorder is not None
+        if recording:
+            self.phase_times = dict.fromkeys(("selection", "crossover", "mutation", "fitness"), 0.0)
+            fitness_requests, fitness_cache_hits = self.fitness_requests, self.fitness_cache_hits
+        start = time.perf_counter()
+
         # Calculate the fitness score for each schedule in the population
         self.calculated_average_fitness()
+        scored = time.perf_counter()
 
         # Create a population of offspring
-        offspring = []
-        for _ in range(len(self.population)):
-            offspring_schedule = self.create_single_offspring()
-            offspring.append([self.calculate_fitness(offspring_schedule), offspring_schedule])
+        offspring = self.create_offspring(len(self.population))
+        offspring_created = time.perf_counter()
+        offspring_fitness = np.array([schedule.fitness for schedule in offspring], dtype=float)
+
+        # Select the most fit of the parent/child schedules for the next generation
+        self.population, self.population_fitness = self.select_survivors(offspring, offspring_fitness)
+        survivors_selected = time.perf_counter()
+        if self.LOCAL_SEARCH_COUNT:
+            self.apply_local_search()
+        searched = time.perf_counter()
+        self.update_best()
+        best_updated = time.perf_counter()
+        if self.EXPORT_TOP_K:
+            self.exporter.export_top(self.population, self.population_fitness, self.EXPORT_DIRECTORY,
+                                     self.EXPORT_TOP_K, self.EXPORT_FORMAT)
+
+        if recording:
+            end = time.perf_counter()
+            self.phase_times["fitness"] += scored - start
+            self.phase_times["offspring"] = offspring_created - scored
+            self.phase_times["survivor_selection"] = survivors_selected - offspring_created
+            self.phase_times["local_search"] = searched - survivors_selected
+            self.phase_times["export"] = end - best_updated
+            self.record_generation(end - start, self.fitness_requests - fitness_requests,
+                                   self.fitness_cache_hits - fitness_cache_hits)
+            self.phase_times = None
+
+    def apply_local_search(self):
+        """
+        Improves the LOCAL_SEARCH_COUNT most fit schedules of the population with local search, keeping the most fit
+        schedule at the front of the population.
+        """
+        count = min(self.LOCAL_SEARCH_COUNT, len(self.population))
+        for index in self.best_indices(self.population_fitness, count, np.arange(len(self.population))):
+            self.population_fitness[index] = self.local_search.repair(self.population[index])
 
-        # Add the parent schedules along with their fitness score
-        parents = []
-        for schedule in self.population:
-            parents.append([self.calculate_fitness(schedule), schedule])
+        best = np.argmax(self.population_fitness)
+        self.population[0], self.population[best] = self.population[best], self.population[0]
+        self.population_fitness[[0, best]] = self.population_fitness[[best, 0]]
 
-        # Sort by fitness score and select the most fit of the parent/child schedules for the next generation
-        sorted_by_fitness = sorted(parents + offspring, key=lambda x: x[0], reverse=True)
-        next_generation = [sorted_by_fitness[i][1] for i in range(self.POPULATION_SIZE)]
+    def update_best(self):
+        """
+        Saves a copy of the most fit schedule in the population if it is better than the best schedule found so far.
+        """
+        fitness = self.population_fitness[0]
+        with self.best_lock:
+            if self.best_fitness is None or fitness > self.best_fitness:
+                self.best_fitness = fitness
+                self.best_schedule = self.population[0].copy()
+
+    def get_best(self):
+        """
+        Finds the best schedule found so far. Safe to call from another thread while the algorithm is running.
+
+        :return: fitness score of the best schedule and the Schedule object itself, or None for both if no generation
+                 has finished yet
+        """
+        with self.best_lock:
+            return self.best_fitness, self.best_schedule
+
+    def select_survivors(self, offspring, offspring_fitness):
+        """
+        Chooses the schedules making up the next generation from the current population and its offspring. Rather than
+        sorting every schedule, the POPULATION_SIZE most fit schedules are found by partial selection in linear time,
+        with only the schedules tied at the cutoff being ordered by the TIE_BREAK rule. If ELITE_COUNT is set, only that
+        many of the most fit parents compete with the offspring. If REMOVE_DUPLICATES is set, only one copy of each
+        genome is kept, unless there aren't enough distinct genomes to fill the next generation. The most fit survivor
+        is always placed first in the population.
+
+        :param offspring: list of scored offspring schedule objects
+        :param offspring_fitness: array holding the fitness score of each offspring
+        :return: list of surviving schedule objects and an array holding their fitness scores
+        """
+        parents = self.population
+        parent_fitness = self.population_fitness
+        if self.ELITE_COUNT is not None:
+            elites = self.best_indices(parent_fitness, min(self.ELITE_COUNT, len(parents)),
+                                       np.arange(len(parents)))
+            parents = [parents[index] for index in elites]
+            parent_fitness = parent_fitness[elites]
+
+        candidates = parents + offspring
+        fitness_scores = np.concatenate((parent_fitness, offspring_fitness))
+
+        # Order of preference among schedules with the same fitness score, lowest first
+        if self.TIE_BREAK == "random":
+            tie_order = np.array(random.sample(range(len(candidates)), len(candidates)))
+        elif self.TIE_BREAK == "offspring":
+            tie_order = np.arange(len(candidates))[::-1]
+        else:
+            tie_order = np.arange(len(candidates))
+
+        num_survivors = min(self.POPULATION_SIZE, len(candidates))
+        if self.REMOVE_DUPLICATES:
+            # Hash each genome, keeping the first copy seen (parents come before offspring)
+            seen = set()
+            distinct = np.zeros(len(candidates), dtype=bool)
+            for index, schedule in enumerate(candidates):
+                genome_key = schedule.genome.tobytes()
+                if genome_key not in seen:
+                    seen.add(genome_key)
+                    distinct[index] = True
+            distinct_indices = np.flatnonzero(distinct)
+            survivors = distinct_indices[self.best_indices(fitness_scores[distinct_indices],
+                                                           min(num_survivors, len(distinct_indices)),
+                                                           tie_order[distinct_indices])]
+            # Fill any remaining places with the most fit duplicates
+            if len(survivors) < num_survivors:
+                duplicate_indices = np.flatnonzero(~distinct)
+                survivors = np.concatenate((survivors, duplicate_indices[self.best_indices(
+                    fitness_scores[duplicate_indices], num_survivors - len(survivors),
+                    tie_order[duplicate_indices])]))
+        else:
+            survivors = self.best_indices(fitness_scores, num_survivors, tie_order)
+
+        # Move the most fit survivor to the front of the population
+        best = np.argmax(fitness_scores[survivors])
+        survivors[[0, best]] = survivors[[best, 0]]
+        return [candidates[index] for index in survivors], fitness_scores[survivors]
+
+    @staticmethod
+    def best_indices(fitness_scores, count, tie_order):
+        """
+        Finds the indices of the most fit schedules using partial selection instead of a full sort.
 
-        self.population = next_generation
+        :param fitness_scores: array holding the fitness score of each schedule
+        :param count: number of schedules to select
+        :param tie_order: array giving the order of preference among schedules with the same fitness score
+        :return: array holding the indices of the selected schedules
+        """
+        if count <= 0:
+            return np.array([], dtype=np.int64)
+        if count >= len(fitness_scores):
+            return np.arange(len(fitness_scores))
+        # Everything more fit than the count-th best schedule is selected, with the remaining places filled by the
+        # schedules tied with it
+        cutoff = fitness_scores[np.argpartition(-fitness_scores, count - 1)[count - 1]]
+        above = np.flatnonzero(fitness_scores > cutoff)
+        tied = np.flatnonzero(fitness_scores == cutoff)
+        tied = tied[np.argsort(tie_order[tied], kind="stable")[:count - len(above)]]
+        return np.concatenate((above, tied))
+
+    def record_generation(self, seconds, fitness_requests, fitness_cache_hits):
+        """
+        Sends the timings and statistics of the latest generation to the recorder. When the offspring are created by
+        worker processes, only the total time spent creating them is known. The fitness cache's own totals since the run
+        started are recorded alongside, with its lookup hit rate counting only the schedules looked up in the cache.
+
+        :param seconds: total time taken to form the generation
+        :param fitness_requests: number of schedules needing a fitness score during the generation
+        :param fitness_cache_hits: number of those schedules whose fitness score was already known, either carried over
+                                   from a parent or found in the fitness cache
+        """
+        population_fitness = self.population_fitness
+        cache_stats = self.fitness_cache.stats()
+        event = {
+            "event": "generation",
+            "generation": self.generation_num,
+            "seconds": seconds,
+            "best_fitness": float(max(population_fitness)),
+            "average_fitness": float(np.mean(population_fitness)),
+            "diversity": len({schedule.genome.tobytes() for schedule in self.population}) / len(self.population),
+            "fitness_requests": fitness_requests,
+            "fitness_cache_hit_rate": fitness_cache_hits / fitness_requests if fitness_requests else None,
+            "fitness_cache_entries": cache_stats["entries"],
+            "fitness_cache_hits": cache_stats["hits"],
+            "fitness_cache_misses": cache_stats["misses"],
+            "fitness_cache_evictions": cache_stats["evictions"],
+            "fitness_cache_lookup_hit_rate": cache_stats["hit_rate"],
+            "fitness_cache_bytes": cache_stats["approximate_bytes"],
+        }
+        for phase, phase_seconds in self.phase_times.items():
+            if self.parallel_engine is None or phase not in ("selection", "crossover", "mutation"):
+                event[f"{phase}_seconds"] = phase_seconds
+        self.recorder.record(event)
+
+    def run_optimization(self, checkpoint_path=None, checkpoint_interval=10, resume=False, termination=None,
+                         export_path=None):
+        """
+        Runs the genetic algorithm until the last five generations have the same fitness score, or until another rule of
+        the termination policy is met. Upon completion, the best schedule found is displayed. If a checkpoint path is
+        given, the population is saved every checkpoint_interval generations and once more when the run finishes.
+
+        :param checkpoint_path: file to save checkpoints to, or None to run without checkpoints
+        :param checkpoint_interval: number of generations between checkpoints
+        :param resume: whether to continue from the checkpoint saved at checkpoint_path, if one exists
+        :param termination: TerminationPolicy deciding when to stop, by default stopping once the average fitness score
+                            has converged for CONVERGENCE_NUM generations
+        :param export_path: CSV, JSON, or XLSX file to export the best schedule to, or None to only display it
+        :return: name of the rule that stopped the run
+        """
+        if termination is None:
+            termination = TerminationPolicy(convergence_num=self.CONVERGENCE_NUM)
+        checkpoint = Checkpoint(checkpoint_path) if checkpoint_path is not None else None
+        if resume and checkpoint is not None and checkpoint.exists():
+            checkpoint.restore(self)
+            print(f"Resuming from generation {self.generation_num}")
+
+        stop_reason = self.evolve(termination, checkpoint, checkpoint_interval, verbose=True)
+        best_schedule = self.get_best()[1]
+        print("\n######  FINAL SCHEDULE  ######")
+        best_schedule.display_phenotype()
+        if export_path is not None:
+            self.exporter.export(best_schedule, export_path)
+        return stop_reason
 
-    def run_optimization(self):
+    def evolve(self, termination, checkpoint=None, checkpoint_interval=10, verbose=False):
         """
-        Runs the genetic algorithm until the last five generations have the same fitness score. Upon completion, the
-        final score is displayed.
+        Forms new generations until the termination policy is met, then shuts down any worker processes.
+
+        :param termination: TerminationPolicy deciding when to stop
+        :param checkpoint: Checkpoint to save the population to, or None to run without checkpoints
+        :param checkpoint_interval: number of generations between checkpoints
+        :param verbose: whether to display the average fitness score of each generation
+        :return: name of the rule that stopped the run
         """
-        generation_num = 0
-        fitness_scores = []
-        converged = False
-        while not converged:
-            last_scores = fitness_scores[-self.CONVERGENCE_NUM:] if len(fitness_scores) >= self.CONVERGENCE_NUM else []
-            converged = True if len(set(last_scores)) == 1 else False
-            generation_num += 1
+        termination.start()
+        stop_reason = None
+        while stop_reason is None:
             self.form_next_generation()
-            fitness_scores.append(self.average_fitness)
-            print(f"Generation {generation_num}  -  Fitness Score: {self.average_fitness}")
+            self.fitness_history.append(self.average_fitness)
+            if verbose:
+                print(f"Generation {self.generation_num}  -  Fitness Score: {self.average_fitness}")
+            if checkpoint is not None and self.generation_num % checkpoint_interval == 0:
+                checkpoint.save(self)
+            stop_reason = termination.check(self.generation_num, self.fitness_history, self.best_fitness)
+
+        self.close()
+        if checkpoint is not None:
+            checkpoint.save(self)
+        if self.recorder is not None:
+            self.recorder.record({"event": "stop", "generation": self.generation_num, "reason": stop_reason})
+        return stop_reason
+
+    def solve(self, time_limit=None, max_generations=None):
+        """
+        Runs the genetic algorithm without displaying anything, stopping once the average fitness score has converged
+        for CONVERGENCE_NUM generations, the time limit is reached, or max_generations generations have been run.
+
+        :param time_limit: number of seconds the algorithm may run for, or None for no limit
+        :param max_generations: largest number of generations to run, or None for no limit
+        :return: SolverResult holding the best schedule found
+        """
+        start = time.perf_counter()
+        termination = TerminationPolicy(convergence_num=self.CONVERGENCE_NUM, time_limit=time_limit,
+                                        max_generations=max_generations)
+        stop_reason = self.evolve(termination)
+        best_fitness, best_schedule = self.get_best()
+        return SolverResult(self.NAME, best_schedule, best_fitness, time.perf_counter() - start, stop_reason,
+                            {"generations": self.generation_num})
+
+    def run_island_optimization(self, num_islands=4, migration_interval=5, num_migrants=2, topology="ring"):
+        """
+        Runs the genetic algorithm as an island model, evolving several populations in separate processes and migrating
+        the most fit schedules between them. Upon completion, the most fit schedule across all islands is displayed.
+
+        :param num_islands: number of separate populations to evolve
+        :param migration_interval: number of generations between migrations
+        :param num_migrants: number of schedules sent from each island during a migration
+        :param topology: which islands receive migrants, either "ring" or "fully_connected"
+        :return: list containing the statistics for each island
+        """
+        island_model = IslandModel(self, num_islands, migration_interval, num_migrants, topology)
+        best_schedule = island_model.run()
+
+        for stats in island_model.island_stats:
+            print(f"Island {stats['island']}  -  Generations: {stats['generations']}  -  "
+                  f"Best Fitness Score: {max(stats['best_fitness'])}")
 
         print("\n######  FINAL SCHEDULE  ######")
-        print(self.population[0].display_phenotype())
+        best_schedule.display_phenotype()
+        return island_model.island_stats
+
+    def close(self):
+        """
+        Shuts down any worker processes used for creating offspring.
+        """
+        if self.parallel_engine is not None:
+            self.parallel_engine.close()
 
 if __name__ == "__main__":
-    opt = Optimizer()
-    opt.run_optimization()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Create a course schedule with the genetic algorithm.")
+    parser.add_argument("--population-size", type=int, default=500, help="number of schedules in the population")
+    parser.add_argument("--crossover-rate", type=float, default=0.001, help="probability of two parents being combined")
+    parser.add_argument("--mutation-rate", type=float, default=0.9, help="probability of a child being left unmutated")
+    parser.add_argument("--convergence-num", type=int, default=3, help="number of equal generations before stopping")
+    parser.add_argument("--workers", type=int, default=1, help="number of worker processes")
+    parser.add_argument("--seed", type=int, help="seed for the random number generator")
+    parser.add_argument("--export", help="CSV, JSON, or XLSX file to export the final schedule to")
+    parser.add_argument("--warm-start", type=float, default=0.0,
+                        help="fraction of the population started from the current room assignments")
+    parser.add_argument("--time-limit", type=float, help="number of seconds the algorithm may run for")
+    parser.add_argument("--checkpoint", help="file to save checkpoints to while the algorithm runs")
+    parser.add_argument("--checkpoint-interval", type=int, default=10, help="number of generations between checkpoints")
+    parser.add_argument("--resume", action="store_true", help="continue from the checkpoint file, if it exists")
+    args = parser.parse_args()
+    if args.resume and args.checkpoint is None:
+        parser.error("--resume requires --checkpoint")
+
+    opt = Optimizer(workers=args.workers, seed=args.seed, population_size=args.population_size,
+                    warm_start=args.warm_start, crossover_rate=args.crossover_rate, mutation_rate=args.mutation_rate,
+                    convergence_num=args.convergence_num)
+    opt.run_optimization(args.checkpoint, args.checkpoint_interval, args.resume,
+                         TerminationPolicy(convergence_num=args.convergence_num, time_limit=args.time_limit),
+                         args.export)
@@ -0,0 +1,109 @@
+import random
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+from Schedule import Schedule
+
+"""
+Class for creating and scoring the offspring of a generation across several processes. The offspring of each generation
+are split into one chunk per worker process, with each worker creating and scoring its chunk using its own copy of the
+optimizer. The catalog is sent to each worker once, when the process pool is started. After that, only the genomes and
+fitness scores of the population are passed between processes, stored in the smallest integer type able to hold every
+course index. Each chunk is given its own random seed, drawn from the main process, so a seeded run produces the same
+schedules every time it is run with the same number of workers.
+
+Author: Ryan Johnson
+"""
+
+# Optimizer used by a worker process to create offspring, set up once when the worker is started
+_worker_optimizer = None
+
+
+def _initialize_worker(catalog, crossover_rate, mutation_rate):
+    """
+    Sets up the optimizer used by a single worker process.
+
+    :param catalog: catalog shared by every schedule in the population
+    :param crossover_rate: probability of two parent genomes being combined
+    :param mutation_rate: probability of a child schedule being left unmutated
+    """
+    global _worker_optimizer
+    from Optimizer import Optimizer
+
+    _worker_optimizer = Optimizer(catalog=catalog, population_size=0)
+    _worker_optimizer.CROSSOVER_RATE = crossover_rate
+    _worker_optimizer.MUTATION_RATE = mutation_rate
+
+
+def _create_offspring_chunk(genomes, fitness_scores, num_offspring, seed):
+    """
+    Creates and scores a chunk of offspring within a worker process.
+
+    :param genomes: genomes of the current population
+    :param fitness_scores: fitness score of each genome in the current population
+    :param num_offspring: number of offspring to be created
+    :param seed: seed for the random number generator used while creating this chunk
+    :return: genomes and fitness scores of the offspring
+    """
+    random.seed(seed)
+    catalog = _worker_optimizer.catalog
+    _worker_optimizer.population = [Schedule.from_genome(catalog, genome, fitness)
+                                    for genome, fitness in zip(genomes, fitness_scores)]
+
+    offspring = _worker_optimizer.create_offspring(num_offspring)
+    offspring_genomes = np.stack([schedule.genome for schedule in offspring]).astype(genomes.dtype)
+    offspring_fitness = np.array([schedule.fitness for schedule in offspring])
+    return offspring_genomes, offspring_fitness
+
+
+class ParallelEngine:
+    def __init__(self, optimizer, workers):
+        self.optimizer = optimizer
+        self.workers = workers
+        self.executor = None
+
+        # Course indices are sent between processes in the smallest integer type able to hold them
+        self.genome_dtype = np.int16 if len(optimizer.course_list) < np.iinfo(np.int16).max else np.int32
+
+    def start(self):
+        """
+        Starts the worker processes, sending each of them a copy of the catalog.
+        """
+        if self.executor is None:
+            optimizer = self.optimizer
+            self.executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_initialize_worker,
+                                                initargs=(optimizer.catalog, optimizer.CROSSOVER_RATE,
+                                                          optimizer.MUTATION_RATE))
+
+    def close(self):
+        """
+        Shuts down the worker processes. They will be started again if more offspring are requested.
+        """
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+    def create_offspring(self, population, num_offspring):
+        """
+        Creates and scores the offspring of a population, splitting the work evenly between the worker processes.
+
+        :param population: list of schedule objects to select parents from, each already scored
+        :param num_offspring: number of offspring to be created
+        :return: list of scored offspring schedule objects
+        """
+        self.start()
+        genomes = np.stack([schedule.genome for schedule in population]).astype(self.genome_dtype)
+        fitness_scores = np.array([schedule.fitness for schedule in population])
+
+        # Divide the offspring between the workers, drawing a seed for each chunk from the main process
+        chunk_sizes = [len(chunk) for chunk in np.array_split(np.arange(num_offspring), self.workers) if len(chunk)]
+        seeds = [random.getrandbits(64) for _ in chunk_sizes]
+        futures = [self.executor.submit(_create_offspring_chunk, genomes, fitness_scores, chunk_size, seed)
+                   for chunk_size, seed in zip(chunk_sizes, seeds)]
+
+        offspring = []
+        for future in futures:
+            offspring_genomes, offspring_fitness = future.result()
+            offspring.extend(Schedule.from_genome(self.optimizer.catalog, genome, fitness)
+                             for genome, fitness in zip(offspring_genomes, offspring_fitness))
+        return offspring
@@ -0,0 +1,182 @@
+import numpy as np
+
+"""
+Class for keeping running counts of everything a schedule is penalized for, allowing the fitness score of a schedule to
+be updated after a single course is moved rather than being recalculated from scratch. The tally keeps:
+  - The number of courses held in each classroom, along with the number of classrooms in use
+  - The number of courses taught by each instructor during each time block, along with the number of times an
+    instructor is assigned more than once to a time block
+  - The number of times each course is placed, along with the number of courses missing from the schedule
+  - The number of MWF time blocks holding a course that is also held on Tth in the same classroom
+  - The number of pairs of overlapping time slots used by the same classroom or the same instructor
+  - The total weighted penalty of the catalog's constraints over every placed course
+
+Placing or removing a course only touches the counts for that course's classroom, instructor, and time block, so each
+update takes constant time no matter how many classrooms, courses, or instructors are being scheduled.
+
+Author: Ryan Johnson
+"""
+
+
+class PenaltyTally:
+    def __init__(self, catalog, genome):
+        self.catalog = catalog
+        # The first meeting pattern of the time grid is treated as MWF, with every other pattern treated as Tth
+        monday_time_slots = catalog.time_grid.pattern_sizes[0]
+        self.monday_time_slots = monday_time_slots
+
+        num_time_slots = genome.shape[1]
+        occupied = genome != -1
+        classroom_ids, time_slot_ids = np.nonzero(occupied)
+        course_ids = genome[occupied]
+
+        self.classroom_counts = np.count_nonzero(occupied, axis=1)
+        self.num_classrooms_used = np.count_nonzero(self.classroom_counts)
+
+        instructor_ids = catalog.course_instructors[course_ids]
+        taught = instructor_ids != -1
+        num_instructors = len(catalog.instructor_list)
+        occupancy_ids = instructor_ids[taught] * num_time_slots + time_slot_ids[taught]
+        self.instructor_occupancy = np.bincount(occupancy_ids, minlength=num_instructors * num_time_slots).reshape(
+            num_instructors, num_time_slots).astype(np.int32)
+        self.num_instructor_conflicts = np.count_nonzero(self.instructor_occupancy > 1)
+
+        self.course_counts = np.bincount(course_ids, minlength=len(catalog.course_list))
+        self.num_missing_courses = np.count_nonzero(self.course_counts == 0)
+
+        # Each occupied time block is encoded as a single (classroom, course) key, matching evaluate_population
+        monday = time_slot_ids < monday_time_slots
+        block_keys = classroom_ids.astype(np.int64) * len(catalog.course_list) + course_ids
+        self.num_duplicated_days = np.count_nonzero(np.isin(block_keys[monday], block_keys[~monday], kind="table"))
+
+        self.num_overlaps = 0
+        if catalog.has_overlaps:
+            upper_overlaps = catalog.upper_slot_overlaps
+            classroom_occupancy = occupied.astype(np.int64)
+            self.num_overlaps += int(np.einsum("rs,st,rt->", classroom_occupancy, upper_overlaps, classroom_occupancy))
+            self.num_overlaps += int(np.einsum("is,st,it->", self.instructor_occupancy, upper_overlaps,
+                                               self.instructor_occupancy))
+
+        self.placement_penalty = 0.0
+        if catalog.has_placement_penalties:
+            self.placement_penalty = float(catalog.course_slot_penalties[course_ids, time_slot_ids].sum() +
+                                           catalog.course_classroom_penalties[course_ids, classroom_ids].sum())
+
+    def copy(self):
+        """
+        Creates a copy of the tally that can be updated without changing this one.
+
+        :return: new PenaltyTally object holding the same counts
+        """
+        tally = PenaltyTally.__new__(PenaltyTally)
+        tally.__dict__.update(self.__dict__)
+        tally.classroom_counts = self.classroom_counts.copy()
+        tally.instructor_occupancy = self.instructor_occupancy.copy()
+        tally.course_counts = self.course_counts.copy()
+        return tally
+
+    def fitness(self):
+        """
+        Calculates the fitness score from the current counts, matching the score given by Optimizer.evaluate_population.
+
+        :return: fitness score of the tallied schedule
+        """
+        fitness = 1 / self.num_classrooms_used
+        fitness -= self.num_instructor_conflicts
+        fitness -= self.num_missing_courses
+        fitness -= self.num_duplicated_days
+        fitness -= self.num_overlaps
+        fitness -= self.placement_penalty
+        return fitness
+
+    def update_overlaps_and_penalties(self, genome, classroom_index, time_slot_index, course_index, sign):
+        """
+        Updates the overlap count and constraint penalty for a course being placed or removed. Only the time slots
+        overlapping the course's time slot are checked, in the course's classroom and for the course's instructor.
+
+        :param genome: genome of the schedule being updated
+        :param classroom_index: index of the classroom the course is being placed in or removed from
+        :param time_slot_index: index of the time block the course is being placed in or removed from
+        :param course_index: index of the course
+        :param sign: 1 if the course is being placed, or -1 if it is being removed
+        """
+        catalog = self.catalog
+        if catalog.has_overlaps:
+            overlapping = catalog.slot_overlaps[time_slot_index]
+            self.num_overlaps += sign * np.count_nonzero((genome[classroom_index] != -1) & overlapping)
+            instructor_index = catalog.course_instructors[course_index]
+            if instructor_index != -1:
+                self.num_overlaps += sign * int(self.instructor_occupancy[instructor_index, overlapping].sum())
+        if catalog.has_placement_penalties:
+            self.placement_penalty += sign * (catalog.course_slot_penalties[course_index, time_slot_index] +
+                                              catalog.course_classroom_penalties[course_index, classroom_index])
+
+    def remove_course(self, genome, classroom_index, time_slot_index):
+        """
+        Updates the counts for the course being removed from a time block. Must be called before the time block is
+        emptied within the genome.
+
+        :param genome: genome of the schedule being updated
+        :param classroom_index: index of the classroom the course is being removed from
+        :param time_slot_index: index of the time block the course is being removed from
+        """
+        course_index = genome[classroom_index, time_slot_index]
+        self.update_overlaps_and_penalties(genome, classroom_index, time_slot_index, course_index, -1)
+
+        self.classroom_counts[classroom_index] -= 1
+        if self.classroom_counts[classroom_index] == 0:
+            self.num_classrooms_used -= 1
+
+        instructor_index = self.catalog.course_instructors[course_index]
+        if instructor_index != -1:
+            self.instructor_occupancy[instructor_index, time_slot_index] -= 1
+            if self.instructor_occupancy[instructor_index, time_slot_index] == 1:
+                self.num_instructor_conflicts -= 1
+
+        self.course_counts[course_index] -= 1
+        if self.course_counts[course_index] == 0:
+            self.num_missing_courses += 1
+
+        classroom_schedule = genome[classroom_index]
+        monday_time_blocks = classroom_schedule[:self.monday_time_slots]
+        tuesday_time_blocks = classroom_schedule[self.monday_time_slots:]
+        if time_slot_index < self.monday_time_slots:
+            if course_index in tuesday_time_blocks:
+                self.num_duplicated_days -= 1
+        elif np.count_nonzero(tuesday_time_blocks == course_index) == 1:
+            self.num_duplicated_days -= np.count_nonzero(monday_time_blocks == course_index)
+
+    def add_course(self, genome, classroom_index, time_slot_index, course_index):
+        """
+        Updates the counts for a course being placed into an empty time block. Must be called before the course is
+        stored within the genome.
+
+        :param genome: genome of the schedule being updated
+        :param classroom_index: index of the classroom the course is being placed in
+        :param time_slot_index: index of the time block the course is being placed in
+        :param course_index: index of the course being placed
+        """
+        self.update_overlaps_and_penalties(genome, classroom_index, time_slot_index, course_index, 1)
+
+        self.classroom_counts[classroom_index] += 1
+        if self.classroom_counts[classroom_index] == 1:
+            self.num_classrooms_used += 1
+
+        instructor_index = self.catalog.course_instructors[course_index]
+        if instructor_index != -1:
+            self.instructor_occupancy[instructor_index, time_slot_index] += 1
+            if self.instructor_occupancy[instructor_index, time_slot_index] == 2:
+                self.num_instructor_conflicts += 1
+
+        self.course_counts[course_index] += 1
+        if self.course_counts[course_index] == 1:
+            self.num_missing_courses -= 1
+
+        classroom_schedule = genome[classroom_index]
+        monday_time_blocks = classroom_schedule[:self.monday_time_slots]
+        tuesday_time_blocks = classroom_schedule[self.monday_time_slots:]
+        if time_slot_index < self.monday_time_slots:
+            if course_index in tuesday_time_blocks:
+                self.num_duplicated_days += 1
+        elif course_index not in tuesday_time_blocks:
+            self.num_duplicated_days += np.count_nonzero(monday_time_blocks == course_index)
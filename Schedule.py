@@ -1,111 +1,255 @@
 import random
-from copy import deepcopy
+import numpy as np
+
+from PenaltyTally import PenaltyTally
 
 """
 Class for representing a single course schedule, each being a single member of the population within the genetic
-algorithm. A schedule must contain three lists: course, classroom, and instructor. Upon initialization, each course is
-assigned to a single time and classroom. This schedule assumes that all courses are either MWF or Tth courses, being 
-held at the same time and in the same classroom each meeting day.
+algorithm. The genome of a schedule is a single integer array with a row for each classroom and a column for each time
+slot of the catalog's time grid, by default the MWF time blocks followed by the Tth time blocks. Each element holds
+the index of the course (within the catalog's course list) held in that classroom during that time block, or -1 if the
+classroom is empty. The course, classroom, and instructor objects themselves are kept in a catalog that is shared by
+every schedule. Upon initialization, each course is assigned to a single time and classroom. This schedule assumes that
+every course follows a single meeting pattern of the time grid, such as MWF or Tth, being held at the same time and in
+the same classroom each meeting day.
 
 Author: Ryan Johnson
 """
 
 
 class Schedule:
-    MONDAY_TIME_SLOTS = 10
-    TUESDAY_TIME_SLOTS = 7
+    def __init__(self, catalog, genome=None):
+        self.catalog = catalog
+        self.course_list = catalog.course_list
+        self.classroom_list = catalog.classroom_list
+        self.instructor_list = catalog.instructor_list
+        self.time_grid = catalog.time_grid
+
+        self.num_time_slots = self.time_grid.num_time_slots
+        if genome is None:
+            genome = np.full((len(self.classroom_list), self.num_time_slots), -1, dtype=np.int32)
+        self.genome = genome
+        self.selection_prob = 0
+        self.fitness = None
+        self.tally = None
+        # Whether the genome and tally are shared with a copy of this schedule
+        self.shared = False
 
-    def __init__(self, course_list, classroom_list, instructor_list):
-        self.course_list = course_list
-        self.classroom_list = deepcopy(classroom_list)
-        self.instructor_list = instructor_list
+    @classmethod
+    def from_genome(cls, catalog, genome, fitness=None):
+        """
+        Creates a schedule from a copy of an existing genome, such as one sent back by a worker process or read from a
+        checkpoint.
 
-        self.num_time_slots = (self.MONDAY_TIME_SLOTS + self.TUESDAY_TIME_SLOTS)
-        self.schedule = [classroom for classroom in self.classroom_list]
-        self.selection_prob = 0
-        self.fitness = 0
+        :param catalog: catalog shared by every schedule
+        :param genome: genome of the schedule
+        :param fitness: fitness score of the genome, or None if it hasn't been scored
+        :return: Schedule object holding the genome
+        """
+        schedule = cls(catalog, np.array(genome, dtype=np.int32))
+        schedule.fitness = fitness
+        return schedule
 
     def create_genome(self):
         """
         Assigns each course in the course list to an available classroom and time. The chosen classroom must have enough
-        seats to hold the number of students enrolled in the course. If an available time slot is not found within 10
-        iterations, the course is skipped.
-        """
-        for course in self.course_list:
-            time_slot_index = None
-            classroom = None
-
-            # If an available time slot and classroom is not found within 10 iterations, skip the course
-            for i in range(10):
-                time_slot_index = random.randint(0, self.num_time_slots - 1)
-                classroom = random.choice(self.classroom_list)
-                time_available, days_index_list = self.time_available(classroom, time_slot_index, course.enrolled)
-                if time_available:
-                    break
-
-            # Assign the course to the classroom at the chosen time
-            classroom_schedule = classroom.schedule
-            classroom_schedule[time_slot_index] = course
-
-    def time_available(self, classroom, time_slot_index, enrollment_num):
-        """
-        Determines if a classroom has enough seats to hold a course and if the classroom is available at the designated
-        time.
-
-        :param classroom: classroom object to be checked
-        :param time_slot_index: index of the time slot to be checked within the designated classroom
-        :param enrollment_num: number of students enrolled in the course being added to the schedule
-        :return: True if the course can be placed in the classroom at the designated time; False otherwise
-        """
-        # Make sure the classroom has enough seats for the number of enrolled students
-        if enrollment_num > classroom.size:
-            return False, -1
-        # If the chosen time index falls within the time slots for Monday, the course will be a MWF course
-        if time_slot_index < self.MONDAY_TIME_SLOTS:
-            classroom_schedule = classroom.schedule
-            if classroom_schedule[time_slot_index] == -1:
-                return True, time_slot_index
-        else:
-            # If the chosen time index falls within the time slots for Tuesday, the course will be a Tth course
-            classroom_schedule = classroom.schedule
-            if classroom_schedule[time_slot_index] == -1:
-                return True, time_slot_index
-        return False, -1
+        seats to hold the number of students enrolled in the course, and is picked from the catalog's index of classrooms
+        each course fits in. A course is only skipped if every classroom large enough for it is already full.
+
+        :return: number of courses that couldn't be placed in the schedule
+        """
+        free_slot_counts = np.count_nonzero(self.genome == -1, axis=1)
+        num_unplaced_courses = 0
+        for course_index in range(len(self.course_list)):
+            classroom_index = self.random_feasible_classroom(course_index, free_slot_counts)
+            if classroom_index is None:
+                num_unplaced_courses += 1
+                continue
+
+            # Assign the course to a random empty time slot within the chosen classroom
+            time_slot_index = random.choice(np.flatnonzero(self.genome[classroom_index] == -1))
+            self.genome[classroom_index, time_slot_index] = course_index
+            free_slot_counts[classroom_index] -= 1
+        return num_unplaced_courses
+
+    def create_current_genome(self, perturbation=0.0):
+        """
+        Assigns each course to the classroom and time it is currently scheduled for in the course spreadsheet. If the
+        course's current time doesn't match one of the time slots, or that time slot is already taken, the course is
+        placed in a random empty time slot of its current classroom, on its current meeting days where possible. A
+        course without a known current classroom, or whose classroom is full or too small, is placed as in
+        create_genome().
+
+        :param perturbation: fraction of courses to place randomly rather than in their current classroom, allowing
+                             several different schedules to be started from the current room assignments
+        :return: number of courses that couldn't be placed in the schedule
+        """
+        classroom_indices = {classroom.name: index for index, classroom in enumerate(self.classroom_list)}
+        free_slot_counts = np.count_nonzero(self.genome == -1, axis=1)
+        num_unplaced_courses = 0
+        for course_index, course in enumerate(self.course_list):
+            classroom_index = classroom_indices.get(course.current_classroom)
+            # The current classroom is only kept if it has enough seats for the course
+            if classroom_index is not None and not self.catalog.course_fits([course_index], classroom_index)[0]:
+                classroom_index = None
+            if classroom_index is None or free_slot_counts[classroom_index] == 0 or random.random() < perturbation:
+                classroom_index = self.random_feasible_classroom(course_index, free_slot_counts)
+                if classroom_index is None:
+                    num_unplaced_courses += 1
+                    continue
+
+            classroom_schedule = self.genome[classroom_index]
+            time_slot_index = self.current_time_slot(course)
+            if time_slot_index is None or classroom_schedule[time_slot_index] != -1:
+                empty_slots = np.flatnonzero(classroom_schedule == -1)
+                # Prefer empty time slots on the days the course currently meets
+                if course.current_days:
+                    same_days = np.intersect1d(empty_slots, self.time_grid.pattern_slots(course.current_days))
+                else:
+                    same_days = empty_slots
+                time_slot_index = random.choice(same_days if len(same_days) else empty_slots)
+
+            classroom_schedule[time_slot_index] = course_index
+            free_slot_counts[classroom_index] -= 1
+        return num_unplaced_courses
+
+    def current_time_slot(self, course):
+        """
+        Finds the time slot matching the time a course is currently scheduled for.
+
+        :param course: course object to be checked
+        :return: index of the matching time slot, or None if the course's current time isn't one of the time slots
+        """
+        if not course.current_days:
+            return None
+        return self.time_grid.find_slot(course.current_days, course.current_start_time)
+
+    def random_feasible_classroom(self, course_index, free_slot_counts):
+        """
+        Picks a random classroom with enough seats for a course and at least one empty time slot. A few classrooms large
+        enough for the course are tried first, which almost always finds one with space. Only if these are all full are
+        the remaining classrooms large enough for the course checked.
+
+        :param course_index: index of the course being placed
+        :param free_slot_counts: number of empty time slots in each classroom
+        :return: index of the chosen classroom, or None if every classroom large enough for the course is full
+        """
+        feasible_classrooms = self.catalog.feasible_classrooms(course_index)
+        if len(feasible_classrooms) == 0:
+            return None
+        for i in range(3):
+            classroom_index = feasible_classrooms[random.randrange(len(feasible_classrooms))]
+            if free_slot_counts[classroom_index] > 0:
+                return classroom_index
+
+        open_classrooms = feasible_classrooms[free_slot_counts[feasible_classrooms] > 0]
+        if len(open_classrooms) == 0:
+            return None
+        return random.choice(open_classrooms)
+
+    def copy(self):
+        """
+        Creates a new schedule with the same genome as this one, along with its fitness score and penalty tally. The
+        copy is made on write: both schedules share the same genome and tally, which are marked read-only, until either
+        schedule is changed. The schedule being changed first copies them, so neither schedule ever sees the other's
+        changes.
+
+        :return: Schedule object identical to this schedule
+        """
+        self.genome.flags.writeable = False
+        self.shared = True
+        schedule = Schedule(self.catalog, self.genome)
+        schedule.fitness = self.fitness
+        schedule.tally = self.tally
+        schedule.shared = True
+        return schedule
+
+    def make_writable(self):
+        """
+        Gives the schedule its own copy of a genome and penalty tally shared with another schedule, so they can be
+        changed.
+        """
+        if not self.shared:
+            return
+        self.genome = self.genome.copy()
+        if self.tally is not None:
+            self.tally = self.tally.copy()
+        self.shared = False
+
+    def ensure_tally(self):
+        """
+        Creates the penalty tally for the schedule's genome if it hasn't been created yet.
+
+        :return: the schedule's PenaltyTally object
+        """
+        if self.tally is None:
+            self.tally = PenaltyTally(self.catalog, self.genome)
+        return self.tally
+
+    def remove_course(self, classroom_index, time_slot_index):
+        """
+        Empties a time block, updating the fitness score from the penalty tally.
+
+        :param classroom_index: index of the classroom holding the course
+        :param time_slot_index: index of the time block holding the course
+        """
+        self.make_writable()
+        tally = self.ensure_tally()
+        tally.remove_course(self.genome, classroom_index, time_slot_index)
+        self.genome[classroom_index, time_slot_index] = -1
+        self.fitness = tally.fitness()
+
+    def place_course(self, classroom_index, time_slot_index, course_index):
+        """
+        Places a course into a time block, replacing any course already held there, and updates the fitness score from
+        the penalty tally.
+
+        :param classroom_index: index of the classroom the course is being placed in
+        :param time_slot_index: index of the time block the course is being placed in
+        :param course_index: index of the course being placed
+        """
+        self.make_writable()
+        tally = self.ensure_tally()
+        if self.genome[classroom_index, time_slot_index] != -1:
+            tally.remove_course(self.genome, classroom_index, time_slot_index)
+            self.genome[classroom_index, time_slot_index] = -1
+        tally.add_course(self.genome, classroom_index, time_slot_index, course_index)
+        self.genome[classroom_index, time_slot_index] = course_index
+        self.fitness = tally.fitness()
+
+    def move_course(self, from_classroom_index, from_time_slot_index, to_classroom_index, to_time_slot_index):
+        """
+        Moves a course from one time block to an empty time block, updating the fitness score from the penalty tally
+        rather than recalculating it from scratch. The tally is created the first time a course is moved.
+
+        :param from_classroom_index: index of the classroom currently holding the course
+        :param from_time_slot_index: index of the time block currently holding the course
+        :param to_classroom_index: index of the classroom the course is being moved to
+        :param to_time_slot_index: index of the empty time block the course is being moved to
+        """
+        course_index = self.genome[from_classroom_index, from_time_slot_index]
+        self.remove_course(from_classroom_index, from_time_slot_index)
+        self.place_course(to_classroom_index, to_time_slot_index, course_index)
 
     def display_genotype(self):
         """
         Prints the schedule list for each classroom in the course schedule.
         """
-        for classroom in self.schedule:
-            print(f"{classroom}: {classroom.schedule}")
+        for classroom, classroom_schedule in zip(self.classroom_list, self.genome):
+            print(f"{classroom}: {[self.catalog.course_name(course_index) for course_index in classroom_schedule]}")
 
     def display_phenotype(self):
         """
         Prints the full schedule in a nicely formatted display. For each classroom, all time blocks are shown with the
         course being held during that time block.
         """
-        for classroom in self.schedule:
-            monday_courses = [course for course in classroom.schedule[:self.MONDAY_TIME_SLOTS]]
-            tuesday_courses = [course for course in classroom.schedule[self.MONDAY_TIME_SLOTS:]]
-
+        course_name = self.catalog.course_name
+        time_slot_table = self.time_grid.table()
+        for classroom, classroom_schedule in zip(self.classroom_list, self.genome):
             print(f"\n{classroom}\n---------")
-
-            print(f"Monday:")
-            print(f"  8:00 - 8:50 AM : {"N/A" if monday_courses[0] == -1 else monday_courses[0]}")
-            print(f"  9:00 - 9:50 AM : {"N/A" if monday_courses[1] == -1 else monday_courses[1]}")
-            print(f"  10:00 - 10:50 AM : {"N/A" if monday_courses[2] == -1 else monday_courses[2]}")
-            print(f"  11:00 - 11:50 AM : {"N/A" if monday_courses[3] == -1 else monday_courses[3]}")
-            print(f"  12:00 - 12:50 PM : {"N/A" if monday_courses[4] == -1 else monday_courses[4]}")
-            print(f"  1:00 - 1:50 PM : {"N/A" if monday_courses[5] == -1 else monday_courses[5]}")
-            print(f"  2:00 - 2:50 PM : {"N/A" if monday_courses[6] == -1 else monday_courses[6]}")
-            print(f"  3:00 - 3:50 PM : {"N/A" if monday_courses[7] == -1 else monday_courses[7]}")
-            print(f"  4:00 - 4:50 PM : {"N/A" if monday_courses[8] == -1 else monday_courses[8]}")
-            print(f"  5:00 - 5:50 PM : {"N/A" if monday_courses[9] == -1 else monday_courses[9]}")
-
-            print(f"Tuesday:")
-            print(f"  8:00 - 9:15 AM : {"N/A" if tuesday_courses[0] == -1 else tuesday_courses[0]}")
-            print(f"  9:30 - 10:45 AM : {"N/A" if tuesday_courses[1] == -1 else tuesday_courses[1]}")
-            print(f"  11:00 AM - 12:15 PM : {"N/A" if tuesday_courses[2] == -1 else tuesday_courses[2]}")
-            print(f"  2:15 - 3:30 AM : {"N/A" if tuesday_courses[3] == -1 else tuesday_courses[3]}")
-            print(f"  3:45 - 5:00 PM : {"N/A" if tuesday_courses[4] == -1 else tuesday_courses[4]}")
-            print(f"  5:15 - 6:30 PM : {"N/A" if tuesday_courses[5] == -1 else tuesday_courses[5]}")
+            previous_days = None
+            for (days, start_time, end_time), course_index in zip(time_slot_table, classroom_schedule):
+                if days != previous_days:
+                    print(f"{days}:")
+                    previous_days = days
+                print(f"  {start_time} - {end_time} : {course_name(course_index)}")
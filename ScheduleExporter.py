@@ -0,0 +1,171 @@
+import argparse
+import csv
+import json
+import math
+import os
+import numpy as np
+from openpyxl import Workbook
+
+from AtomicWrite import atomic_write
+from Catalog import Catalog
+from Checkpoint import Checkpoint
+from DataLoader import DataLoader
+
+"""
+Class for writing schedules to CSV, JSON, or XLSX files, using the same columns as the course spreadsheet so an exported
+schedule can be read alongside schedule.xlsx. Each row is a single course, giving its title, meeting time, meeting days,
+building, room, instructor, and enrollment. Rows are streamed straight from the genome: the text of every course,
+classroom, and time slot is looked up once per catalog, and XLSX files are written with openpyxl's write-only mode, so
+no spreadsheet or DataFrame is built in memory.
+
+Files are written to a temporary path and then moved into place, so a file being watched is never seen half-written.
+This makes export_top() cheap enough to be run every generation, overwriting the same files with the most fit schedules
+for live monitoring. A schedule saved in a checkpoint can also be exported from the command line, e.g.
+`py ScheduleExporter.py checkpoint.npz best_schedule.xlsx`.
+
+Author: Ryan Johnson
+"""
+
+
+class ScheduleExporter:
+    COLUMNS = ["SEC_SHORT_TITLE", "CSM_START_TIME", "CSM_END_TIME", "CSM_MONDAY", "CSM_TUESDAY", "CSM_WEDNESDAY",
+               "CSM_THURSDAY", "CSM_FRIDAY", "CSM_BLDG", "CSM_ROOM", "SEC_FACULTY_INFO", "SEC_CAPACITY"]
+    FORMATS = ("csv", "json", "xlsx")
+    # Days of the time grid written to each of the day columns
+    DAY_COLUMN_DAYS = ["M", "T", "W", "TH", "F"]
+
+    def __init__(self, catalog):
+        self.catalog = catalog
+        instructor_names = [instructor.name for instructor in catalog.instructor_list]
+        self.course_columns = []
+        for course, instructor_index in zip(catalog.course_list, catalog.course_instructors):
+            instructor_name = instructor_names[instructor_index] if instructor_index != -1 else ""
+            self.course_columns.append((course.name, instructor_name, self.enrollment_value(course.enrolled)))
+        # Classroom names are written as the building and room number joined by a hyphen, e.g. SIMP-120
+        self.classroom_columns = [tuple(classroom.name.split("-", 1)) if "-" in classroom.name else (classroom.name, "")
+                                  for classroom in catalog.classroom_list]
+
+    @staticmethod
+    def enrollment_value(enrolled):
+        """
+        Converts a course enrollment to the value written in the SEC_CAPACITY column.
+
+        :param enrolled: number of students enrolled in the course
+        :return: enrollment as an integer, or an empty string if the enrollment is unknown
+        """
+        if enrolled is None or (isinstance(enrolled, float) and math.isnan(enrolled)):
+            return ""
+        return int(enrolled)
+
+    def rows(self, schedule):
+        """
+        Creates the rows of a schedule one at a time, ordered by classroom and then by time slot.
+
+        :param schedule: Schedule object to be exported
+        :return: generator of tuples holding a value for each of the COLUMNS
+        """
+        time_grid = self.catalog.time_grid
+        time_slot_columns = [(start_time, end_time, *("Y" if day in days else "-" for day in self.DAY_COLUMN_DAYS))
+                             for days, start_time, end_time in zip(time_grid.slot_days, time_grid.start_times,
+                                                                   time_grid.end_times)]
+        genome = schedule.genome
+        for classroom_index, time_slot_index in zip(*np.nonzero(genome != -1)):
+            name, instructor_name, enrollment = self.course_columns[genome[classroom_index, time_slot_index]]
+            yield (name, *time_slot_columns[time_slot_index], *self.classroom_columns[classroom_index],
+                   instructor_name, enrollment)
+
+    def write_csv(self, schedule, file):
+        """
+        Writes a schedule to an open text file as CSV, starting with a header row.
+
+        :param schedule: Schedule object to be exported
+        :param file: text file opened with newline=""
+        """
+        writer = csv.writer(file)
+        writer.writerow(self.COLUMNS)
+        writer.writerows(self.rows(schedule))
+
+    def write_json(self, schedule, file):
+        """
+        Writes a schedule to an open text file as a JSON array, with an object for each row.
+
+        :param schedule: Schedule object to be exported
+        :param file: text file opened for writing
+        """
+        file.write("[")
+        separator = "\n"
+        for row in self.rows(schedule):
+            file.write(separator + json.dumps(dict(zip(self.COLUMNS, row))))
+            separator = ",\n"
+        file.write("\n]\n")
+
+    def write_xlsx(self, schedule, file):
+        """
+        Writes a schedule to an XLSX workbook with a single sheet, streaming the rows with openpyxl's write-only mode.
+
+        :param schedule: Schedule object to be exported
+        :param file: path or binary file to save the workbook to
+        """
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet("Schedule")
+        sheet.append(self.COLUMNS)
+        for row in self.rows(schedule):
+            sheet.append(row)
+        workbook.save(file)
+
+    def export(self, schedule, path, file_format=None):
+        """
+        Writes a schedule to a file, replacing the file only once it has been fully written.
+
+        :param schedule: Schedule object to be exported
+        :param path: file to write the schedule to
+        :param file_format: one of FORMATS, or None to use the extension of the path
+        """
+        if file_format is None:
+            file_format = os.path.splitext(path)[1].lstrip(".").lower()
+        if file_format not in self.FORMATS:
+            raise ValueError(f"Unknown export format '{file_format}', expected one of {self.FORMATS}")
+
+        if file_format == "xlsx":
+            with atomic_write(path, "wb") as file:
+                self.write_xlsx(schedule, file)
+        else:
+            with atomic_write(path, "w", newline="") as file:
+                if file_format == "csv":
+                    self.write_csv(schedule, file)
+                else:
+                    self.write_json(schedule, file)
+
+    def export_top(self, schedules, fitness_scores, directory, num_schedules=1, file_format="csv"):
+        """
+        Writes the most fit schedules to a directory as schedule_1, schedule_2, and so on, with schedule_1 being the
+        most fit. Files from a previous call are overwritten.
+
+        :param schedules: list of Schedule objects to choose from
+        :param fitness_scores: fitness score of each schedule
+        :param directory: directory to write the schedules to
+        :param num_schedules: number of schedules to export
+        :param file_format: one of FORMATS
+        :return: list of the paths written
+        """
+        fitness_scores = np.asarray(fitness_scores, dtype=float)
+        num_schedules = min(num_schedules, len(schedules))
+        ranked = np.argsort(-fitness_scores, kind="stable")[:num_schedules]
+        paths = []
+        for rank, schedule_index in enumerate(ranked, start=1):
+            path = os.path.join(directory, f"schedule_{rank}.{file_format}")
+            self.export(schedules[schedule_index], path, file_format)
+            paths.append(path)
+        return paths
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the most fit schedule saved in a checkpoint.")
+    parser.add_argument("checkpoint", help="checkpoint file saved by the optimizer")
+    parser.add_argument("output", help="file to export the schedule to, ending in .csv, .json, or .xlsx")
+    args = parser.parse_args()
+
+    loader = DataLoader()
+    classroom_list, course_list, instructor_list = loader.load()
+    catalog = Catalog(course_list, classroom_list, instructor_list, *loader.load_config())
+    ScheduleExporter(catalog).export(Checkpoint(args.checkpoint).best_schedule(catalog), args.output)
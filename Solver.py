@@ -0,0 +1,57 @@
+from abc import ABC, abstractmethod
+import numpy as np
+
+"""
+Common interface for the different ways of building a course schedule. Every solver is created from a catalog and
+returns a SolverResult from solve(), so the genetic algorithm, the greedy packer, and the integer programming model
+can be swapped for one another and compared on the same data:
+  - Optimizer: the genetic algorithm
+  - GreedySolver: a first-fit-decreasing packer, giving a fast baseline
+  - IlpSolver: an integer programming model solved with an open-source solver, giving an optimal schedule (or the best
+    one found within its time limit) to judge the other solvers against
+
+Author: Ryan Johnson
+"""
+
+
+class SolverResult:
+    def __init__(self, solver, schedule, fitness, seconds, status, details=None):
+        self.solver = solver
+        self.schedule = schedule
+        self.fitness = fitness
+        self.seconds = seconds
+        self.status = status
+        self.details = details if details is not None else {}
+
+    def num_classrooms_used(self):
+        """
+        Counts the classrooms holding at least one course in the schedule found.
+
+        :return: number of classrooms used, or None if no schedule was found
+        """
+        if self.schedule is None:
+            return None
+        return int(np.count_nonzero((self.schedule.genome != -1).any(axis=1)))
+
+    def summary(self):
+        """
+        Summarizes the result as a dictionary that can be written as JSON.
+
+        :return: dictionary holding the solver name, fitness score, wall-clock time, status, and solver details
+        """
+        return {"solver": self.solver, "fitness": None if self.fitness is None else float(self.fitness),
+                "seconds": self.seconds, "status": self.status, "classrooms_used": self.num_classrooms_used(),
+                **self.details}
+
+
+class Solver(ABC):
+    NAME = "solver"
+
+    @abstractmethod
+    def solve(self, time_limit=None):
+        """
+        Builds a schedule for every course in the catalog.
+
+        :param time_limit: number of seconds the solver may run for, or None for no limit
+        :return: SolverResult holding the best schedule found
+        """
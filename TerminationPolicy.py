@@ -0,0 +1,73 @@
+import time
+
+"""
+Class for deciding when the genetic algorithm should stop running. Any combination of the following rules can be used,
+with the algorithm stopping as soon as any one of them is met:
+  - converged: the average fitness score has been exactly the same for the last convergence_num generations
+  - time_limit: the run has taken at least time_limit seconds of wall-clock time
+  - max_generations: max_generations generations have been run
+  - stalled: the best fitness score hasn't improved by more than stall_tolerance for stall_generations generations
+  - target_fitness: a schedule with a fitness score of at least target_fitness has been found
+Rules are only checked between generations, so a run may exceed its time limit by up to one generation.
+
+Author: Ryan Johnson
+"""
+
+
+class TerminationPolicy:
+    def __init__(self, convergence_num=3, time_limit=None, max_generations=None, stall_generations=None,
+                 stall_tolerance=0.0, target_fitness=None):
+        self.convergence_num = convergence_num
+        self.time_limit = time_limit
+        self.max_generations = max_generations
+        self.stall_generations = stall_generations
+        self.stall_tolerance = stall_tolerance
+        self.target_fitness = target_fitness
+
+        self.start_time = None
+        self.best_fitness = None
+        self.generations_since_improvement = 0
+
+    def start(self):
+        """
+        Starts the wall-clock timer and resets the stall counter, called once at the start of a run.
+        """
+        self.start_time = time.perf_counter()
+        self.best_fitness = None
+        self.generations_since_improvement = 0
+
+    def elapsed(self):
+        """
+        Finds the wall-clock time since the run started.
+
+        :return: number of seconds since start() was called
+        """
+        return time.perf_counter() - self.start_time
+
+    def check(self, generation_num, fitness_history, best_fitness):
+        """
+        Determines whether the run should stop after the latest generation.
+
+        :param generation_num: number of generations run so far
+        :param fitness_history: list of the average fitness score of every generation so far
+        :param best_fitness: fitness score of the best schedule found so far
+        :return: name of the rule that was met, or None if the run should continue
+        """
+        if self.best_fitness is None or best_fitness > self.best_fitness + self.stall_tolerance:
+            self.best_fitness = best_fitness
+            self.generations_since_improvement = 0
+        else:
+            self.generations_since_improvement += 1
+
+        if self.target_fitness is not None and best_fitness >= self.target_fitness:
+            return "target_fitness"
+        if self.convergence_num is not None and len(fitness_history) >= self.convergence_num and \
+                len(set(fitness_history[-self.convergence_num:])) == 1:
+            return "converged"
+        if self.stall_generations is not None and self.generations_since_improvement >= self.stall_generations:
+            return "stalled"
+        if self.max_generations is not None and generation_num >= self.max_generations:
+            return "max_generations"
+        if self.time_limit is not None and self.elapsed() >= self.time_limit:
+            return "time_limit"
+        return None
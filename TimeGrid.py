@@ -0,0 +1,177 @@
+import json
+import re
+import numpy as np
+
+"""
+Class for describing the time blocks courses can be scheduled in. The grid is made of meeting patterns, such as MWF or
+Tth, each having the days it meets on and a list of time slots with a start and end time. The time slots of every
+pattern are laid out one after another, in the order the patterns are given, forming the columns of each schedule's
+genome. The first pattern plays the part of MWF when penalizing courses held on both MWF and Tth.
+
+Time slots from different patterns overlap when the patterns share a day and the times of the slots intersect. The
+grid compiles these into a boolean overlap matrix once, so the fitness function can penalize a classroom or instructor
+booked during two overlapping time slots without comparing times while the algorithm is running.
+
+A grid can be loaded from a JSON file, e.g.
+    {"patterns": [{"name": "MWF", "days": ["M", "W", "F"], "slots": [["8:00AM", "8:50AM"], ...]},
+                  {"name": "TTH", "days": ["T", "TH"], "slots": [["8:00AM", "9:15AM"], ...]}]}
+Time slots given without times are allowed, but never overlap with any other time slot.
+
+Author: Ryan Johnson
+"""
+
+
+class TimeGrid:
+    MONDAY_START_TIMES = ["8:00AM", "9:00AM", "10:00AM", "11:00AM", "12:00PM", "1:00PM", "2:00PM", "3:00PM", "4:00PM",
+                          "5:00PM"]
+    MONDAY_END_TIMES = ["8:50AM", "9:50AM", "10:50AM", "11:50AM", "12:50PM", "1:50PM", "2:50PM", "3:50PM", "4:50PM",
+                        "5:50PM"]
+    TUESDAY_START_TIMES = ["8:00AM", "9:30AM", "11:00AM", "2:15PM", "3:45PM", "5:15PM", "6:45PM"]
+    TUESDAY_END_TIMES = ["9:15AM", "10:45AM", "12:15PM", "3:30PM", "5:00PM", "6:30PM", "8:00PM"]
+
+    def __init__(self, patterns):
+        self.patterns = patterns
+        self.pattern_sizes = [len(pattern["slots"]) for pattern in patterns]
+        self.num_time_slots = sum(self.pattern_sizes)
+
+        # Pattern, days, and times of each time slot, in the order of the genome's columns
+        self.slot_patterns = []
+        self.slot_days = []
+        self.start_times = []
+        self.end_times = []
+        for pattern in patterns:
+            for start_time, end_time in pattern["slots"]:
+                self.slot_patterns.append(pattern["name"])
+                self.slot_days.append(set(pattern["days"]))
+                self.start_times.append(start_time)
+                self.end_times.append(end_time)
+        start_minutes = np.array([self.parse_time(time) for time in self.start_times], dtype=float)
+        end_minutes = np.array([self.parse_time(time) for time in self.end_times], dtype=float)
+
+        # Slots without known times compare as NaN, so they never overlap
+        shared_days = np.array([[bool(days & other_days) for other_days in self.slot_days] for days in self.slot_days],
+                               dtype=bool).reshape(self.num_time_slots, self.num_time_slots)
+        intersect = (start_minutes[:, np.newaxis] < end_minutes[np.newaxis]) & \
+            (start_minutes[np.newaxis] < end_minutes[:, np.newaxis])
+        self.overlaps = shared_days & intersect
+        np.fill_diagonal(self.overlaps, False)
+
+    @classmethod
+    def default(cls, monday_time_slots=10, tuesday_time_slots=7):
+        """
+        Creates the MWF and Tth grid used by Carroll College. Time slots beyond those with known times are added without
+        times.
+
+        :param monday_time_slots: number of MWF time slots
+        :param tuesday_time_slots: number of Tth time slots
+        :return: TimeGrid object
+        """
+        def slots(start_times, end_times, num_time_slots):
+            known = list(zip(start_times, end_times))[:num_time_slots]
+            return known + [("", "")] * (num_time_slots - len(known))
+
+        return cls([
+            {"name": "MWF", "days": ["M", "W", "F"],
+             "slots": slots(cls.MONDAY_START_TIMES, cls.MONDAY_END_TIMES, monday_time_slots)},
+            {"name": "TTH", "days": ["T", "TH"],
+             "slots": slots(cls.TUESDAY_START_TIMES, cls.TUESDAY_END_TIMES, tuesday_time_slots)},
+        ])
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Creates a grid from its description in a configuration file.
+
+        :param data: dictionary with a "patterns" list, each pattern having a name, a list of days, and a list of
+                     [start time, end time] slots
+        :return: TimeGrid object
+        """
+        patterns = []
+        for pattern in data["patterns"]:
+            if not pattern.get("slots"):
+                raise ValueError(f"Meeting pattern '{pattern.get('name')}' has no time slots")
+            patterns.append({"name": str(pattern["name"]), "days": [str(day) for day in pattern["days"]],
+                             "slots": [(str(start_time), str(end_time)) for start_time, end_time in pattern["slots"]]})
+        return cls(patterns)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Loads a grid from a JSON file.
+
+        :param path: JSON file describing the grid
+        :return: TimeGrid object
+        """
+        with open(path) as file:
+            return cls.from_dict(json.load(file))
+
+    @staticmethod
+    def parse_time(time):
+        """
+        Converts a time written as in the course spreadsheet, e.g. 2:15PM, to the number of minutes after midnight.
+
+        :param time: time to be converted
+        :return: number of minutes after midnight, or None if the time is empty or not understood
+        """
+        match = re.fullmatch(r"\s*(\d{1,2}):(\d{2})\s*([AaPp])[Mm]\s*", time or "")
+        if match is None:
+            return None
+        hours, minutes, half = int(match[1]) % 12, int(match[2]), match[3].upper()
+        return (hours + (12 if half == "P" else 0)) * 60 + minutes
+
+    def pattern_slots(self, name):
+        """
+        Finds the time slots of a meeting pattern.
+
+        :param name: name of the meeting pattern, e.g. MWF
+        :return: array of time slot indices, empty if the grid has no such pattern
+        """
+        return np.array([index for index, pattern in enumerate(self.slot_patterns) if pattern == name], dtype=np.int64)
+
+    def find_slot(self, pattern_name, start_time):
+        """
+        Finds the time slot of a meeting pattern starting at the given time.
+
+        :param pattern_name: name of the meeting pattern, e.g. MWF
+        :param start_time: start time written as in the course spreadsheet
+        :return: index of the time slot, or None if no time slot matches
+        """
+        for index, (pattern, slot_start_time) in enumerate(zip(self.slot_patterns, self.start_times)):
+            if pattern == pattern_name and slot_start_time == start_time:
+                return index
+        return None
+
+    def slots_during(self, days, start_time, end_time):
+        """
+        Finds the time slots meeting on any of the given days at any point between two times.
+
+        :param days: list of days, e.g. ["M", "W"]
+        :param start_time: start of the period, written as in the course spreadsheet
+        :param end_time: end of the period, written as in the course spreadsheet
+        :return: array of time slot indices
+        """
+        start, end = self.parse_time(start_time), self.parse_time(end_time)
+        if start is None or end is None:
+            raise ValueError(f"Couldn't read the period {start_time} - {end_time}")
+        days = set(days)
+        return np.array([index for index in range(self.num_time_slots)
+                         if self.slot_days[index] & days and self.start_times[index] and self.end_times[index]
+                         and self.parse_time(self.start_times[index]) < end
+                         and start < self.parse_time(self.end_times[index])], dtype=np.int64)
+
+    def table(self):
+        """
+        Lists the pattern, start time, and end time of each time slot, in the same order as the columns of the genome.
+
+        :return: list holding a (pattern name, start time, end time) tuple for each time slot
+        """
+        return list(zip(self.slot_patterns, self.start_times, self.end_times))
+
+    def description(self):
+        """
+        Describes the grid as text, used to tell whether two grids are the same.
+
+        :return: string listing the days and times of each time slot
+        """
+        return ";".join(f"{pattern}:{','.join(sorted(days))}:{start_time}-{end_time}" for pattern, days, start_time,
+                        end_time in zip(self.slot_patterns, self.slot_days, self.start_times, self.end_times))
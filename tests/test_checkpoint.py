@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+from Benchmark import Benchmark
+from Checkpoint import Checkpoint
+from Optimizer import Optimizer
+from TerminationPolicy import TerminationPolicy
+
+"""
+Tests checking that a run resumed from a checkpoint carries on exactly as the run would have without stopping.
+
+Author: Ryan Johnson
+"""
+
+
+@pytest.fixture
+def catalog():
+    return Benchmark(num_classrooms=8, num_courses=40, num_instructors=8, seed=1).generate_catalog()
+
+
+def test_resumed_run_matches_uninterrupted_run(catalog, tmp_path, capsys):
+    checkpoint_path = str(tmp_path / "checkpoint.npz")
+    optimizer = Optimizer(catalog=catalog, population_size=20, seed=4)
+    optimizer.evolve(TerminationPolicy(convergence_num=None, max_generations=3), Checkpoint(checkpoint_path),
+                     checkpoint_interval=3)
+    optimizer.evolve(TerminationPolicy(convergence_num=None, max_generations=6))
+
+    resumed = Optimizer(catalog=catalog, population_size=20, seed=5)
+    resumed.run_optimization(checkpoint_path, checkpoint_interval=3, resume=True,
+                             termination=TerminationPolicy(convergence_num=None, max_generations=6))
+
+    assert "Resuming from generation 3" in capsys.readouterr().out
+    assert resumed.generation_num == optimizer.generation_num == 6
+    assert len(optimizer.fitness_history) == 6
+    assert resumed.fitness_history == pytest.approx(optimizer.fitness_history)
+    assert np.array_equal(resumed.population_fitness, optimizer.population_fitness)
+    for schedule, resumed_schedule in zip(optimizer.population, resumed.population):
+        assert np.array_equal(schedule.genome, resumed_schedule.genome)
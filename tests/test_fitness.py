@@ -0,0 +1,119 @@
+import random
+import numpy as np
+import pytest
+
+from Benchmark import Benchmark
+from Catalog import Catalog
+from Constraints import CapacitySlack
+from LocalSearch import LocalSearch
+from Optimizer import Optimizer
+from TimeGrid import TimeGrid
+
+"""
+Tests checking that the batch fitness function and the incremental penalty tally agree with one another. Every test runs
+on a small synthetic catalog, so the spreadsheets aren't needed.
+
+Author: Ryan Johnson
+"""
+
+
+@pytest.fixture
+def catalog():
+    """
+    Creates a small catalog whose time grid has overlapping time slots and whose courses are penalized for using
+    oversized classrooms, so every penalty of the fitness function is exercised.
+    """
+    base = Benchmark(num_classrooms=8, num_courses=40, num_instructors=8, seed=1).generate_catalog()
+    grid = TimeGrid.default(6, 4)
+    grid = TimeGrid(grid.patterns + [{"name": "MW", "days": ["M", "W"],
+                                      "slots": [("8:00AM", "9:15AM"), ("10:30AM", "11:45AM")]}])
+    return Catalog(base.course_list, base.classroom_list, base.instructor_list, grid, [CapacitySlack()])
+
+
+def reference_fitness(catalog, genome):
+    """
+    Calculates the fitness score of a single genome one time block at a time, following the penalties described by
+    Optimizer.evaluate_population.
+    """
+    num_monday_slots = catalog.time_grid.pattern_sizes[0]
+    num_classrooms, num_time_slots = genome.shape
+    fitness = 1 / sum(1 for classroom_index in range(num_classrooms) if (genome[classroom_index] != -1).any())
+
+    taught = {}
+    for (classroom_index, time_slot_index), course_index in np.ndenumerate(genome):
+        if course_index != -1 and catalog.course_instructors[course_index] != -1:
+            key = (catalog.course_instructors[course_index], time_slot_index)
+            taught[key] = taught.get(key, 0) + 1
+    fitness -= sum(1 for count in taught.values() if count > 1)
+
+    fitness -= len(catalog.course_list) - len(set(genome[genome != -1].tolist()))
+
+    for classroom_index in range(num_classrooms):
+        tuesday_courses = set(genome[classroom_index, num_monday_slots:].tolist())
+        fitness -= sum(1 for course_index in genome[classroom_index, :num_monday_slots]
+                       if course_index != -1 and course_index in tuesday_courses)
+
+    for first_slot in range(num_time_slots):
+        for second_slot in range(first_slot + 1, num_time_slots):
+            if not catalog.slot_overlaps[first_slot, second_slot]:
+                continue
+            fitness -= sum(1 for classroom_index in range(num_classrooms)
+                           if genome[classroom_index, first_slot] != -1 and genome[classroom_index, second_slot] != -1)
+            for instructor_index in range(len(catalog.instructor_list)):
+                fitness -= taught.get((instructor_index, first_slot), 0) * taught.get((instructor_index, second_slot), 0)
+
+    for (classroom_index, time_slot_index), course_index in np.ndenumerate(genome):
+        if course_index != -1:
+            fitness -= catalog.course_slot_penalties[course_index, time_slot_index] + \
+                catalog.course_classroom_penalties[course_index, classroom_index]
+    return fitness
+
+
+def random_move(schedule):
+    """
+    Moves a random course of a schedule to a random empty time block.
+    """
+    occupied = np.argwhere(schedule.genome != -1)
+    empty = np.argwhere(schedule.genome == -1)
+    from_block = occupied[random.randrange(len(occupied))]
+    to_block = empty[random.randrange(len(empty))]
+    schedule.move_course(*from_block, *to_block)
+
+
+def test_evaluate_population_matches_reference(catalog):
+    optimizer = Optimizer(catalog=catalog, population_size=30, seed=2)
+    genomes = np.stack([schedule.genome for schedule in optimizer.population])
+    # Repeat a course on Tth and double-book an instructor so those penalties are always present
+    genomes[0, 0, -1] = genomes[0, 0][genomes[0, 0] != -1][0] if (genomes[0, 0] != -1).any() else 0
+    genomes[1, 1, 0] = genomes[1, 0, 0] if genomes[1, 0, 0] != -1 else 0
+
+    expected = [reference_fitness(catalog, genome) for genome in genomes]
+    assert optimizer.evaluate_population(genomes) == pytest.approx(expected)
+
+
+def test_tally_matches_evaluate_population_on_copies(catalog):
+    random.seed(3)
+    optimizer = Optimizer(catalog=catalog, population_size=10, seed=3)
+    local_search = LocalSearch(catalog)
+    originals = optimizer.population
+    original_genomes = [schedule.genome.copy() for schedule in originals]
+    for schedule in originals:
+        schedule.ensure_tally()
+        schedule.fitness = schedule.tally.fitness()
+
+    copies = []
+    for index, schedule in enumerate(originals):
+        child = schedule.copy()
+        for _ in range(5):
+            random_move(child)
+        if index % 2:
+            local_search.repair(child)
+        copies.append(child)
+
+    for schedules in (originals, copies):
+        genomes = np.stack([schedule.genome for schedule in schedules])
+        expected = optimizer.evaluate_population(genomes)
+        assert [schedule.fitness for schedule in schedules] == pytest.approx(expected)
+        assert [schedule.tally.fitness() for schedule in schedules] == pytest.approx(expected)
+    for schedule, genome in zip(originals, original_genomes):
+        assert np.array_equal(schedule.genome, genome)
@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from Benchmark import Benchmark
+from Catalog import Catalog
+from Classroom import Classroom
+from Constraints import CapacitySlack, RoomFeatures
+from Course import Course
+from GreedySolver import GreedySolver
+from Instructor import Instructor
+from Optimizer import Optimizer
+
+pulp = pytest.importorskip("pulp")
+from IlpSolver import IlpSolver  # noqa: E402
+
+"""
+Tests checking that the integer programming model agrees with the fitness function, including when the catalog's
+weighted constraints make using more classrooms worthwhile.
+
+Author: Ryan Johnson
+"""
+
+
+def penalized_catalog():
+    """
+    Creates a catalog where both courses fit in the large classroom, but each needs a feature only one of the small
+    classrooms has and is penalized for leaving most of the large classroom's seats empty.
+    """
+    classroom_list = [Classroom("HALL-100", 40), Classroom("LAB-110", 10), Classroom("MEDIA-120", 10)]
+    instructor_list = [Instructor("Instructor 0"), Instructor("Instructor 1")]
+    course_list = [Course("Chemistry", 10.0, instructor_list[0]), Course("Film", 10.0, instructor_list[1])]
+    for course, instructor in zip(course_list, instructor_list):
+        instructor.courses.append(course)
+    constraints = [CapacitySlack(weight=1.5),
+                   RoomFeatures({"Chemistry": ["lab"], "Film": ["projector"]},
+                                {"HALL-100": ["lab", "projector"], "LAB-110": ["lab"], "MEDIA-120": ["projector"]})]
+    return Catalog(course_list, classroom_list, instructor_list, None, constraints)
+
+
+def test_ilp_trades_classrooms_for_penalties():
+    catalog = penalized_catalog()
+    result = IlpSolver(catalog).solve()
+    fitness = Optimizer(catalog=catalog, population_size=0).evaluate_population(result.schedule.genome[np.newaxis])
+
+    assert result.status == "optimal"
+    assert result.fitness == pytest.approx(fitness[0])
+    assert result.fitness == pytest.approx(0.5)
+    assert result.num_classrooms_used() == 2
+
+
+def test_ilp_matches_evaluate_population_and_beats_greedy():
+    base = Benchmark(num_classrooms=6, num_courses=20, num_instructors=6, seed=2).generate_catalog()
+    catalog = Catalog(base.course_list, base.classroom_list, base.instructor_list, base.time_grid,
+                      [CapacitySlack(max_empty_fraction=0.3, weight=0.2)])
+    result = IlpSolver(catalog).solve()
+    fitness = Optimizer(catalog=catalog, population_size=0).evaluate_population(result.schedule.genome[np.newaxis])
+
+    assert result.status == "optimal"
+    assert result.fitness == pytest.approx(fitness[0])
+    assert result.fitness >= GreedySolver(catalog).solve().fitness - 1e-9